@@ -3,41 +3,45 @@
 Created on Sat May 12 18:55:35 2018
 @author: Yggdrasil
 """
+import time
 from tkinter import Label, Button, Frame, Tk
-from random import randint
-import copy
 
+import quiz_engine
+import quiz_log
+import quiz_scheduler
 
-def read_file():
-    filename = "./Fragen.txt"
-
-    with open(filename) as csvfile:
-        data = csvfile.readlines()
-        for a in range(7, len(data)):
-            App.questions.append(data[a].strip().split(","))
-
-    App.max_points = len(App.questions)
-
-
-class App:
-    questions = []
-
-    question_number = 0
-
-    old_questions = []
+# ask the due questions with spaced repetition instead of all questions once
+spaced_repetition = False
+learner_file = "./Fragen.txt.learner.npz"
 
-    right_answer = ""
+# record every answer in an append only log, see quiz_log.difficulty
+log_answers = False
+log_file = "./Fragen.txt.answers.bin"
 
-    first_button_click = True
 
-    max_points = 0
+def read_file():
+    filename = "./Fragen.txt"
 
-    current_points = 0
+    return quiz_engine.QuestionBank.from_file(filename)
 
-    def __init__(self, master):
 
-        read_file()
-        App.old_questions = copy.deepcopy(App.questions)
+class App:
+    """
+    Tk front end of the quiz. All state of the quiz is kept in a
+    quiz_engine.QuizSession (or a quiz_scheduler.ReviewSession), so several
+    Apps can run on the same questions.
+    """
+
+    def __init__(self, master, bank=None, session=None, log=None):
+
+        # an empty bank is a valid bank, only None means Fragen.txt
+        if session is None:
+            session = quiz_engine.QuizSession(bank if bank is not None else read_file())
+        self.session = session
+        self.log = log
+        self.log_session = log.new_session() if log is not None else 0
+        self.shown = time.monotonic()
+        self.attempt = 0
         frame = Frame(master, bg="SpringGreen3", width=200)
         frame.pack()
 
@@ -55,7 +59,7 @@ class App:
 
         # Punktestand
         self.points = Label(frame,
-                            text=str(App.current_points)+" / "+str(App.max_points),
+                            text=str(self.session.points)+" / "+str(self.session.max_points),
                             bg="SpringGreen3",
                             fg="White",
                             anchor="w",)
@@ -132,48 +136,22 @@ class App:
         self.sec_ans.config(bg="light sky blue")
         self.third_ans.config(bg="light sky blue")
         self.fourth_ans.config(bg="light sky blue")
-        App.first_button_click = True
 
-        number = randint(0, len(App.questions) - 1)
-        App.question_number = number
-        App.right_answer = App.questions[number][1]
+        drawn = self.session.draw()
 
-        if (len(App.questions) != 0):
+        if drawn is not None:
 
-            frage = App.questions[number][0]
+            number, frage, answers = drawn
+            self.shown = time.monotonic()
+            self.attempt = 0
 
             self.question_label.config(text=frage)
 
-            ans_place = list(range(1, 5))
-
-            for i in range(4):
-                place = randint(0, 3 - i)
-
-                if (i == 0):
-                    self.first_ans.config(
-                        text=App.questions[number][ans_place[place]])
-
-                    ans_place.remove(ans_place[place])
-
-                elif (i == 1):
-                    self.sec_ans.config(
-                        text=App.questions[number][ans_place[place]])
-
-                    ans_place.remove(ans_place[place])
-
-                elif (i == 2):
-                    self.third_ans.config(
-                        text=App.questions[number][ans_place[place]])
-
-                    ans_place.remove(ans_place[place])
-
-                else:
-                    self.fourth_ans.config(
-                        text=App.questions[number][ans_place[place]])
-
-                    ans_place.remove(ans_place[place])
-
-            App.questions.remove(App.questions[number])
+            # the answers are already shuffled by the session
+            self.first_ans.config(text=answers[0])
+            self.sec_ans.config(text=answers[1])
+            self.third_ans.config(text=answers[2])
+            self.fourth_ans.config(text=answers[3])
 
         else:
             self.question_label.config(
@@ -181,7 +159,15 @@ class App:
 
     def check_answers(self, text, button_nr):
 
-        if text == App.right_answer:
+        right = self.session.answer(text)
+
+        if self.log is not None and self.session.current is not None:
+            self.log.record(self.log_session,
+                            self.session.bank[self.session.current], text,
+                            self.attempt, right, time.monotonic() - self.shown)
+            self.attempt += 1
+
+        if right:
             if button_nr == 1:
                 self.first_ans.config(bg="lawn green")
             if button_nr == 2:
@@ -191,10 +177,7 @@ class App:
             if button_nr == 4:
                 self.fourth_ans.config(bg="lawn green")
 
-            if App.first_button_click:
-                App.first_button_click = False
-                App.current_points += 1
-                App.update_points(self)
+            self.update_points()
 
         else:
             if button_nr == 1:
@@ -207,12 +190,22 @@ class App:
                 self.fourth_ans.config(bg="orange red")
 
     def update_points(self):
-        self.points.config(text=str(App.current_points)+" / "+str(App.max_points))
+        self.points.config(text=str(self.session.points)+" / "+str(self.session.max_points))
 
 
 
 
 if __name__ == "__main__":
     root = Tk()
-    app = App(root)
-    root.mainloop()
+    answer_log = quiz_log.AnswerLog(log_file) if log_answers else None
+    if spaced_repetition:
+        scheduler = quiz_scheduler.Scheduler(read_file(), learner_file)
+        app = App(root, session=quiz_scheduler.ReviewSession(scheduler),
+                  log=answer_log)
+        root.mainloop()
+        scheduler.save()
+    else:
+        app = App(root, log=answer_log)
+        root.mainloop()
+    if answer_log is not None:
+        answer_log.close()
@@ -1,5 +1,11 @@
 import numpy as np
 
+import rps_engine
+
+# play against an opponent learning from your moves instead of a random one
+ai_opponent = False
+
+
 class RockPaperScissors:
     """
     Implementation of the game Rock, Paper, Scissors
@@ -8,34 +14,47 @@ class RockPaperScissors:
     scissors = {'rock': False, 'paper': True}
     rock = {'scissors': True, 'paper': False}
     paper = {'scissors': False, 'rock': True}
-    
+
     choices = {'scissors': scissors, 'rock': rock, 'paper': paper}
     winner = {'Tied':"No Winner! ", 'human':"YOU WON! ",'ai':"You lost! "}
 
-    def __init__(self):
+    def __init__(self, ai=False):
+
+        # with ai the computer predicts your next move from your last ones
+        # (rps_engine.NGramStrategy) instead of choosing randomly
+        if ai:
+            self.ai = rps_engine.NGramStrategy(order=3)
+            self.ai.reset(1, np.random.default_rng())
+        else:
+            self.ai = None
+
+        self.human_points = 0
+        self.ai_points = 0
+        self.my_choice = None
+        self.ai_choice = None
+        self.gewinner = None
+        self.new_round = True
 
-	self.human_points = 0
-	self.ai_points = 0
-	self.my_choice = None
-	self.ai_choice = None
-	self.gewinner = None
-	self.new_round = True	
-		
 
     def computer_choice(self):
         """
         The computer chooses a value
         """
 
-	self.ai_choice = np.random.choice(['rock','paper','scissors'])
+        if self.ai is None:
+            self.ai_choice = np.random.choice(['rock','paper','scissors'])
+        else:
+            self.ai_choice = rps_engine.decode(self.ai.move()[0])
 
     def human_choice(self):
         """
         The human player chooses a value
         """
 
-        self.my_choice = str(raw_input("Choose 'rock','paper' or 'scissors': "))
-	print(self.my_choice)
+        self.my_choice = None
+        while self.my_choice not in RockPaperScissors.choices:
+            self.my_choice = str(input("Choose 'rock','paper' or 'scissors': "))
+        print(self.my_choice)
 
     def evaluate_game(self):
         """
@@ -43,24 +62,24 @@ class RockPaperScissors:
         """
 
         if self.my_choice == self.ai_choice:
-	    self.gewinner = 'Tied'
+            self.gewinner = 'Tied'
 
-	else:
-	    if RockPaperScissors.choices[self.my_choice][self.ai_choice]:
-		self.gewinner = 'human'
+        else:
+            if RockPaperScissors.choices[self.my_choice][self.ai_choice]:
+                self.gewinner = 'human'
 
-	    else:
-		self.gewinner = 'ai'
+            else:
+                self.gewinner = 'ai'
 
     def print_result(self):
         """
         Visualise game result
         """
-	
-	print("%s Computer has %s" %(RockPaperScissors.winner[self.gewinner], self.ai_choice))
+
+        print("%s Computer has %s" %(RockPaperScissors.winner[self.gewinner], self.ai_choice))
 
         print("Points: You vs AI ")
-	print("\t %d vs %d" % (self.human_points, self.ai_points) )
+        print("\t %d vs %d" % (self.human_points, self.ai_points) )
 
     def count_points(self):
         """
@@ -68,37 +87,44 @@ class RockPaperScissors:
         """
 
         if self.gewinner == 'human':
-	    self.human_points += 1
-	if self.gewinner == 'ai':
-	    self.ai_points += 1
+            self.human_points += 1
+        if self.gewinner == 'ai':
+            self.ai_points += 1
 
     def new_game_question(self):
         """
         Ask human player for new game
         """
-	human_answer = str(raw_input("Would you like to play another round? (y/n)"))
+        human_answer = str(input("Would you like to play another round? (y/n)"))
+
+        if human_answer in ['y', 'Y', 'yes', ]:
+            self.new_round = True
 
-	if human_answer in ['y', 'Y', 'yes', ]: 
-	    self.new_round = True
-	
         else:
-	    self.new_round = False
-	    
+            self.new_round = False
+
 
     def run(self):
 
-	while(self.new_round == True):
-	    
-	    RockPaperScissors.human_choice(self)
-	    RockPaperScissors.computer_choice(self)
-	    RockPaperScissors.evaluate_game(self)
-	    RockPaperScissors.count_points(self)
-	    RockPaperScissors.print_result(self)
-	    RockPaperScissors.new_game_question(self)
-	
-	print("See you again, human!")
+        while(self.new_round == True):
+
+            # the computer chooses first, so it can not react to your choice
+            RockPaperScissors.computer_choice(self)
+            RockPaperScissors.human_choice(self)
+
+            # the AI learns your move once both moves of this round are known
+            if self.ai is not None:
+                self.ai.update(np.array([rps_engine.encode(self.ai_choice)]),
+                               np.array([rps_engine.encode(self.my_choice)]))
+
+            RockPaperScissors.evaluate_game(self)
+            RockPaperScissors.count_points(self)
+            RockPaperScissors.print_result(self)
+            RockPaperScissors.new_game_question(self)
+
+        print("See you again, human!")
 
 
 if __name__ == "__main__":
-   game = RockPaperScissors()
-   game.run()
+    game = RockPaperScissors(ai=ai_opponent)
+    game.run()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Tile map of the capytulate world
+
+The world is a square of tiles from -size to size in both directions,
+surrounded by a ring of walls. Everything about a tile is generated once
+per map as NumPy arrays: the terrain, the chance of an encounter and the
+monster met there. Moving, checking for walls and looking up an encounter
+are single reads from these arrays, so also large maps cost nothing per
+step.
+
+ChunkedMap is an endless world with the same interface. It is split into
+chunks of CHUNK x CHUNK tiles, which are generated when they are first
+needed, from a seed derived from the world seed and the chunk coordinates,
+so the world is the same in whatever order it is explored. Only the
+recently used chunks are kept in memory (LRU), chunks can be stored as
+.npy files and loaded again instead of being generated.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+TOWN, GRASS, FOREST, SWAMP, WALL, BOSS = range(6)
+TERRAIN = ['town', 'grass', 'forest', 'swamp', 'wall', 'boss']
+
+# chance to meet a monster per step on every terrain
+ENCOUNTER_RATE = np.array([0.0, 0.2, 0.35, 0.5, 0.0, 1.0])
+
+# monsters living on every terrain
+MONSTERS = {GRASS: ['rat', 'wolf', 'bandit'],
+            FOREST: ['wolf', 'bear', 'goblin'],
+            SWAMP: ['giant frog', 'swamp troll', 'will-o-wisp']}
+MONSTER_NAMES = sorted({name for names in MONSTERS.values() for name in names})
+
+# terrain of the wild tiles and how common it is
+WILD = [GRASS, FOREST, SWAMP]
+WILD_P = [0.6, 0.3, 0.1]
+
+# tiles per side of a chunk of the endless world
+CHUNK = 32
+
+# share of rocks (walls) and bosses among the tiles of the endless world
+ROCK_P = 0.05
+BOSS_P = 0.002
+
+
+def draw_monsters(terrain, rng):
+    """
+    The monster of every tile, drawn from the monsters of its terrain, -1
+    for tiles without monsters.
+    """
+    monster = np.full(terrain.shape, -1, dtype=np.int16)
+    for kind, names in MONSTERS.items():
+        tiles = terrain == kind
+        codes = np.array([MONSTER_NAMES.index(name) for name in names], dtype=np.int16)
+        monster[tiles] = rng.choice(codes, size=np.count_nonzero(tiles))
+    return monster
+
+
+def meet(kind, rate, monster, rng):
+    """
+    Encounter on a tile of terrain kind with the given encounter rate and
+    monster.
+    """
+    if kind == TOWN:
+        return 'town'
+    if kind == BOSS:
+        return 'boss'
+    if kind == WALL or rng.random() >= rate:
+        return None
+    return MONSTER_NAMES[monster]
+
+
+class TileMap:
+
+    def __init__(self, terrain, monster, level=1):
+        self.terrain = terrain
+        self.monster = monster
+        self.encounter_rate = ENCOUNTER_RATE[terrain]
+        self.level = level
+        # index of the coordinate 0, the outermost ring are walls
+        self.offset = terrain.shape[0] // 2
+        self.size = self.offset - 1
+
+    @classmethod
+    def generate(cls, size=7, level=1, seed=None):
+        """
+        Random map from -size to size with the town in the middle and a
+        boss in every corner.
+        """
+        rng = np.random.default_rng(seed)
+        n = 2 * size + 3
+        terrain = rng.choice(WILD, size=(n, n), p=WILD_P).astype(np.int8)
+        terrain[[0, -1], :] = WALL
+        terrain[:, [0, -1]] = WALL
+        terrain[size + 1, size + 1] = TOWN
+        for corner in (1, n - 2):
+            terrain[corner, [1, n - 2]] = BOSS
+
+        return cls(terrain, draw_monsters(terrain, rng), level)
+
+    def inside(self, x, y):
+        return abs(x) <= self.offset and abs(y) <= self.offset
+
+    def tile(self, x, y):
+        """
+        Terrain code at (x, y), everything outside the map is wall.
+        """
+        if not self.inside(x, y):
+            return WALL
+        return int(self.terrain[x + self.offset, y + self.offset])
+
+    def is_free(self, x, y):
+        return self.tile(x, y) != WALL
+
+    def encounter(self, x, y, rng):
+        """
+        What the character meets at (x, y): 'town', 'boss', the name of a
+        monster or None.
+        """
+        kind = self.tile(x, y)
+        if kind == WALL:
+            return None
+        return meet(kind, self.encounter_rate[x + self.offset, y + self.offset],
+                    self.monster[x + self.offset, y + self.offset], rng)
+
+
+class ChunkedMap:
+    """
+    Endless map, generated chunk by chunk. At most max_chunks chunks are in
+    memory; with a directory every chunk is written there once and loaded
+    from there later, changed chunks (set_tile) are written when they are
+    dropped from memory or by flush().
+    """
+
+    def __init__(self, seed, level=1, max_chunks=64, directory=None):
+        self.seed = seed
+        self.level = level
+        self.max_chunks = max_chunks
+        self.directory = directory
+        # (cx, cy) -> [array (terrain, monster), changed]
+        self.chunks = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def chunk_file(self, cx, cy):
+        return os.path.join(self.directory, 'chunk_{}_{}_{}_{}.npy'.format(
+            self.seed, self.level, cx, cy))
+
+    def generate_chunk(self, cx, cy):
+        # non negative entropy for every chunk coordinate
+        rng = np.random.default_rng([self.seed, self.level, cx + 2 ** 31, cy + 2 ** 31])
+        terrain = rng.choice(WILD, size=(CHUNK, CHUNK), p=WILD_P).astype(np.int8)
+        terrain[rng.random((CHUNK, CHUNK)) < ROCK_P] = WALL
+        terrain[rng.random((CHUNK, CHUNK)) < BOSS_P] = BOSS
+        if cx == 0 and cy == 0:
+            terrain[0, 0] = TOWN
+        return np.stack([terrain, draw_monsters(terrain, rng)])
+
+    def chunk(self, cx, cy):
+        """
+        The chunk (cx, cy) as array (terrain, monster), from memory, from
+        disk or newly generated.
+        """
+        key = (cx, cy)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key][0]
+
+        if self.directory is not None and os.path.exists(self.chunk_file(cx, cy)):
+            data = np.load(self.chunk_file(cx, cy))
+        else:
+            data = self.generate_chunk(cx, cy)
+            if self.directory is not None:
+                np.save(self.chunk_file(cx, cy), data)
+
+        self.chunks[key] = [data, False]
+        if len(self.chunks) > self.max_chunks:
+            old_key, (old_data, changed) = self.chunks.popitem(last=False)
+            if changed and self.directory is not None:
+                np.save(self.chunk_file(*old_key), old_data)
+        return data
+
+    def prefetch(self, x, y):
+        """
+        Makes sure the chunks around (x, y) are ready before they are
+        entered.
+        """
+        cx, cy = x // CHUNK, y // CHUNK
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                self.chunk(cx + dx, cy + dy)
+        # the chunk of the character stays the most recently used one
+        self.chunk(cx, cy)
+
+    def tile(self, x, y):
+        return int(self.chunk(x // CHUNK, y // CHUNK)[0, x % CHUNK, y % CHUNK])
+
+    def set_tile(self, x, y, kind):
+        """
+        Changes a tile, e.g. after a boss is defeated.
+        """
+        self.chunk(x // CHUNK, y // CHUNK)[0, x % CHUNK, y % CHUNK] = kind
+        self.chunks[(x // CHUNK, y // CHUNK)][1] = True
+
+    def is_free(self, x, y):
+        return self.tile(x, y) != WALL
+
+    def encounter(self, x, y, rng):
+        data = self.chunk(x // CHUNK, y // CHUNK)
+        kind = data[0, x % CHUNK, y % CHUNK]
+        return meet(kind, ENCOUNTER_RATE[kind], data[1, x % CHUNK, y % CHUNK], rng)
+
+    def flush(self):
+        """
+        Writes all changed chunks in memory.
+        """
+        if self.directory is None:
+            return
+        for key, entry in self.chunks.items():
+            if entry[1]:
+                np.save(self.chunk_file(*key), entry[0])
+                entry[1] = False
@@ -4,11 +4,12 @@ Created on Mon Jul  2 13:44:05 2018
 """
 
 import capytulate_character
+import capytulate_map
 import numpy as np
 
 class World:
     
-    def __init__(self,char="default"):
+    def __init__(self,char="default",seed=None,infinite=False,directory=None):
         
         if char == "default":
             self.character = capytulate_character.Character("human")
@@ -17,9 +18,44 @@ class World:
             self.character = char
             
         self.worldsize = 7
+
+        # the endless world of chunks, stored in directory if given
+        self.infinite = infinite
+        self.directory = directory
+
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy)
+
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+        self.new_map()
         
         
         
+    def new_map(self):
+        """
+        Generates the map of the current level of the character. The map grows
+        with the level, so that the jump out of town stays inside the walls.
+        The endless map is only generated around the character, chunk by chunk.
+        """
+
+        level = self.character.level
+
+        if self.infinite:
+            if hasattr(self, 'map'):
+                self.map.flush()
+
+            self.map = capytulate_map.ChunkedMap(self.seed, level,
+                                                 directory=self.directory)
+            self.map.prefetch(self.character.x_position,
+                              self.character.y_position)
+
+        else:
+            self.map = capytulate_map.TileMap.generate(
+                self.worldsize + (level - 1) * 3, level, self.rng)
+
+
     def move(self):
         """
         Method to move the character through the world
@@ -30,7 +66,7 @@ class World:
         userinput = ""
         
         while not allowed_userinput:
-            userinput = str(raw_input('In which direction do you wish to walk? '
+            userinput = str(input('In which direction do you wish to walk? '
                                     +'[w,a,s,d]: '))
         
             if not userinput in ['w','s','a','d']:
@@ -42,6 +78,9 @@ class World:
         new_x = 0
         new_y = 0
                 
+        if self.character.level != self.map.level:
+            self.new_map()
+
         if self.character.x_position == 0 and self.character.y_position == 0:
             
             if userinput == "w":
@@ -55,11 +94,16 @@ class World:
                 
             if userinput == "a":
                 new_y = -1 * (5 + (self.character.level - 1) * 3)
-    
-                
-            self.character.x_position = new_x
-            self.character.y_position = new_y
-            
+
+            if not self.map.is_free(new_x, new_y):
+
+                print("There is a wall here, i can't move in this direction")
+
+            else:
+
+                self.character.x_position = new_x
+                self.character.y_position = new_y
+
         else:
             
             if userinput == "w":
@@ -74,19 +118,24 @@ class World:
             if userinput == "a":
                 new_y = -1 
                 
-            if np.absolute(self.character.x_position + new_x) > self.worldsize and np.absolute(self.character.y_position) < self.worldsize:
-                
+            if not self.map.is_free(self.character.x_position + new_x,
+                                    self.character.y_position + new_y):
+
                 print("There is a wall here, i can't move in this direction")
-                
-            if np.absolute(self.character.y_position + new_y) > self.worldsize and np.absolute(self.character.y_position) < self.worldsize:
-                
-                print("There is a wall here, i can't move in this direction")    
-             
-            self.character.x_position += new_x
-            self.character.y_position += new_y
-            
-      
-            
+
+            else:
+
+                self.character.x_position += new_x
+                self.character.y_position += new_y
+
+        if self.infinite:
+            self.map.prefetch(self.character.x_position,
+                              self.character.y_position)
+
+        self.encounter()
+
+
+
     def analyze_userinput(self,some_input):
         """
         checks the userinput and let the character behave accordingly
@@ -105,15 +154,17 @@ class World:
         encounter if he is not on his safespot (0,0)
         """
         
-        x_pos = self.character.x_position
-        y_pos = self.character.y_position
-        
-        if x_pos == 0 and y_pos == 0:
+        found = self.map.encounter(self.character.x_position,
+                                   self.character.y_position, self.rng)
+
+        if found == 'town':
             print("Ah, back in Town, you are in your safespot!")
-        elif np.absolute(x_pos) == self.worldsize and np.absolute(y_pos) == self.worlsize:
+        elif found == 'boss':
             print("Bossfight!!")
-        
-                
+        elif found is not None:
+            print("A wild {} appears!".format(found))
+
+
     def run(self):
         """
         executing all the methods to let the game flow
@@ -122,10 +173,14 @@ class World:
         exiting = False
         
         while not exiting:
-            userinput_game = str(raw_input("What would you like to do?: "))
+            userinput_game = str(input("What would you like to do?: "))
             
             if userinput_game in ['Exit','exit','logout','Logout','log out','Log out']:
                 exiting = True
+
+                if self.infinite:
+                    self.map.flush()
+
                 print("See you soon!")
             
             else:
@@ -4,11 +4,31 @@ The double pendulum problem
 ===========================
 
 This animation illustrates the double pendulum problem.
+
+Two integrators are available: ``integrate.odeint`` on the equations of
+motion (the default), or the implicit midpoint rule on Hamilton's equations
+(``integrator = 'symplectic'``). The midpoint rule is symplectic and takes
+steps of a fixed length, so its energy error oscillates without drifting,
+as long as the step is small enough for the fastest swings of the
+pendulum. For the default setup this needs 4 steps per frame (0.0125 s):
+over 1000 s the energy error then stays below 2% without any trend. With
+one step per frame (0.05 s) it does not, single steps can lose a third of
+the energy. The midpoint mode is slower than odeint and less accurate in
+the energy, it is meant for studying a fixed step geometric integrator.
+
+With ``streaming = True`` the trajectory is not precomputed: frames are
+integrated lazily by a generator while the animation runs, and only a fixed
+length trail of the lower bob is kept. Setting ``save_file`` renders the
+animation headlessly with the Agg backend into an MP4 or GIF file.
 """
 
 # Double pendulum formula translated from the C code at
 # http://www.physics.usyd.edu.au/~wheat/dpend_html/solve_dpend.c
 
+import warnings
+from collections import deque
+from functools import partial
+
 from numpy import sin, cos
 import numpy as np
 import matplotlib.pyplot as plt
@@ -45,6 +65,174 @@ def derivs(state, t):
 
     return dydx
 
+
+def mass_matrix_coefficients():
+    """Coefficients a, b, c of the mass matrix [[a, c cos(d)], [c cos(d), b]]."""
+    return (M1 + M2)*L1*L1, M2*L2*L2, M2*L1*L2
+
+
+def to_canonical(state):
+    """Convert (th1, w1, th2, w2) to canonical (th1, p1, th2, p2)."""
+    a, b, c = mass_matrix_coefficients()
+    cos_del = cos(state[0] - state[2])
+    p1 = a*state[1] + c*cos_del*state[3]
+    p2 = b*state[3] + c*cos_del*state[1]
+    return np.array([state[0], p1, state[2], p2])
+
+
+def from_canonical(z):
+    """Convert canonical (th1, p1, th2, p2) back to (th1, w1, th2, w2)."""
+    a, b, c = mass_matrix_coefficients()
+    cos_del = cos(z[0] - z[2])
+    det = a*b - c*c*cos_del*cos_del
+    w1 = (b*z[1] - c*cos_del*z[3])/det
+    w2 = (a*z[3] - c*cos_del*z[1])/det
+    return np.array([z[0], w1, z[2], w2])
+
+
+def hamilton(z):
+    """Right hand side of Hamilton's equations in canonical coordinates."""
+    a, b, c = mass_matrix_coefficients()
+    del_ = z[0] - z[2]
+    sin_del, cos_del = sin(del_), cos(del_)
+    det = a*b - c*c*cos_del*cos_del
+    p1, p2 = z[1], z[3]
+
+    w1 = (b*p1 - c*cos_del*p2)/det
+    w2 = (a*p2 - c*cos_del*p1)/det
+
+    # derivative of the kinetic energy with respect to del_ = th1 - th2
+    num = b*p1*p1 + a*p2*p2 - 2*c*cos_del*p1*p2
+    dkin = c*sin_del*p1*p2/det - num*c*c*sin_del*cos_del/(det*det)
+
+    return np.array([w1,
+                     -dkin - (M1 + M2)*G*L1*sin(z[0]),
+                     w2,
+                     dkin - M2*G*L2*sin(z[2])])
+
+
+def energy(state):
+    """Total energy of one or many (th1, w1, th2, w2) states."""
+    state = np.asarray(state)
+    th1, w1, th2, w2 = state[..., 0], state[..., 1], state[..., 2], state[..., 3]
+    a, b, c = mass_matrix_coefficients()
+    kin = 0.5*a*w1*w1 + 0.5*b*w2*w2 + c*w1*w2*cos(th1 - th2)
+    pot = -(M1 + M2)*G*L1*cos(th1) - M2*G*L2*cos(th2)
+    return kin + pot
+
+
+def hamilton_jacobian(z):
+    """Jacobian of hamilton() at z, rows f, columns (th1, p1, th2, p2)."""
+    a, b, c = mass_matrix_coefficients()
+    del_ = z[0] - z[2]
+    sin_del, cos_del = sin(del_), cos(del_)
+    det = a*b - c*c*cos_del*cos_del
+    ddet = 2*c*c*cos_del*sin_del
+    p1, p2 = z[1], z[3]
+
+    w1 = (b*p1 - c*cos_del*p2)/det
+    w2 = (a*p2 - c*cos_del*p1)/det
+    num = b*p1*p1 + a*p2*p2 - 2*c*cos_del*p1*p2
+
+    # derivatives of w1, w2 and dkin (see hamilton) with respect to del_
+    w1_d = (c*sin_del*p2 - w1*ddet)/det
+    w2_d = (c*sin_del*p1 - w2*ddet)/det
+    dkin_d = (c*cos_del*p1*p2/det - c*sin_del*p1*p2*ddet/det**2
+              - c*c*((cos_del**2 - sin_del**2)*num
+                     + 2*c*cos_del*sin_del**2*p1*p2)/det**2
+              + 2*c*c*cos_del*sin_del*num*ddet/det**3)
+    # ... and with respect to p1, p2
+    dkin_p1 = c*sin_del*(p2 - 2*c*cos_del*w1)/det
+    dkin_p2 = c*sin_del*(p1 - 2*c*cos_del*w2)/det
+
+    return np.array([
+        [w1_d, b/det, -w1_d, -c*cos_del/det],
+        [-dkin_d - (M1 + M2)*G*L1*cos(z[0]), -dkin_p1, dkin_d, -dkin_p2],
+        [w2_d, -c*cos_del/det, -w2_d, a/det],
+        [dkin_d, dkin_p1, -dkin_d - M2*G*L2*cos(z[2]), dkin_p2]])
+
+
+def symplectic_step(z, h, tol=1e-12, max_iter=20, max_halvings=12):
+    """
+    One implicit midpoint step z -> z + h*f((z + z_new)/2).
+
+    The implicit equation is solved with Newton's method, started from
+    an explicit Euler predictor. The step size is not adapted to the
+    energy, so the energy stays an independent check of the integration.
+    Only if Newton does not converge the step is replaced by two steps of
+    half the length, with a warning; after max_halvings halvings a
+    RuntimeError is raised.
+    """
+    z_new = z + h*hamilton(z)
+    for _ in range(max_iter):
+        mid = 0.5*(z + z_new)
+        res = z_new - z - h*hamilton(mid)
+        jac = np.eye(4) - 0.5*h*hamilton_jacobian(mid)
+        try:
+            delta = np.linalg.solve(jac, res)
+        except np.linalg.LinAlgError:
+            break
+        z_new = z_new - delta
+        if not np.all(np.isfinite(z_new)):
+            break
+        if np.max(np.abs(delta)) < tol*(1 + np.max(np.abs(z_new))):
+            return z_new
+
+    if max_halvings == 0:
+        raise RuntimeError('implicit midpoint step did not converge, '
+                           'step size %g' % h)
+    warnings.warn('Newton did not converge for step size %g, '
+                  'using two half steps' % h, RuntimeWarning)
+    z = symplectic_step(z, h/2, tol, max_iter, max_halvings - 1)
+    return symplectic_step(z, h/2, tol, max_iter, max_halvings - 1)
+
+
+def integrate_symplectic(state, t, substeps=4):
+    """
+    Same interface as integrate.odeint(derivs, state, t). Every interval of
+    t is split into substeps implicit midpoint steps of equal length.
+    """
+    y = np.empty((len(t), 4))
+    y[0] = state
+    z = to_canonical(state)
+    for i in range(1, len(t)):
+        h = (t[i] - t[i - 1])/substeps
+        for _ in range(substeps):
+            z = symplectic_step(z, h)
+        y[i] = from_canonical(z)
+    return y
+
+
+def energy_drift(y):
+    """Relative energy error (E(t) - E(0)) / |E(0)| along a trajectory."""
+    e = energy(y)
+    return (e - e[0])/np.abs(e[0])
+
+
+def pendulum_frames(state, dt, integrator='odeint', n_frames=None,
+                    substeps=4):
+    """
+    Integrate the pendulum lazily, one frame of length dt at a time.
+
+    Yields (time, x1, y1, x2, y2) for every frame. Runs forever if n_frames
+    is None, memory use does not depend on the number of frames.
+    """
+    state = np.array(state, dtype=float)
+    z = to_canonical(state)
+    i = 0
+    while n_frames is None or i < n_frames:
+        x1_ = L1*sin(state[0])
+        y1_ = -L1*cos(state[0])
+        yield i*dt, x1_, y1_, L2*sin(state[2]) + x1_, -L2*cos(state[2]) + y1_
+
+        if integrator == 'symplectic':
+            for _ in range(substeps):
+                z = symplectic_step(z, dt/substeps)
+            state = from_canonical(z)
+        else:
+            state = integrate.odeint(derivs, state, [0.0, dt])[-1]
+        i += 1
+
 # create a time array from 0..100 sampled at 0.05 second steps
 dt = 0.05
 t = np.arange(0.0, 100, dt)
@@ -59,28 +247,53 @@ w2 = 0.0
 # initial state
 state = np.radians([th1, w1, th2, w2])
 
-# integrate your ODE using scipy.integrate.
-y = integrate.odeint(derivs, state, t)
+# integrate your ODE using scipy.integrate ('odeint') or the implicit
+# midpoint rule ('symplectic', slower, bounded but larger energy error)
+integrator = 'odeint'
 
-x1 = L1*sin(y[:, 0])
-y1 = -L1*cos(y[:, 0])
+# streaming integrates while animating instead of precomputing everything,
+# trail_length is the number of past positions of the lower bob drawn
+streaming = False
+trail_length = 100
 
-x2 = L2*sin(y[:, 2]) + x1
-y2 = -L2*cos(y[:, 2]) + y1
+# e.g. 'double_pendulum.mp4' or 'double_pendulum.gif' to render headlessly
+save_file = None
+
+if save_file is not None:
+    plt.switch_backend('Agg')
+
+if not streaming:
+    if integrator == 'symplectic':
+        y = integrate_symplectic(state, t)
+    else:
+        y = integrate.odeint(derivs, state, t)
+
+    print('max. relative energy drift = %.2e' % np.max(np.abs(energy_drift(y))))
+
+    x1 = L1*sin(y[:, 0])
+    y1 = -L1*cos(y[:, 0])
+
+    x2 = L2*sin(y[:, 2]) + x1
+    y2 = -L2*cos(y[:, 2]) + y1
 
 fig = plt.figure()
 ax = fig.add_subplot(111, autoscale_on=False, xlim=(-2, 2), ylim=(-2, 2))
 ax.grid()
 
 line, = ax.plot([], [], 'o-', lw=5, markersize=20)
+trail_line, = ax.plot([], [], '-', lw=1, alpha=0.6)
 time_template = 'time = %.1fs'
 time_text = ax.text(0.05, 0.9, '', transform=ax.transAxes)
 
+# ring buffer with the last trail_length positions of the lower bob
+trail = deque(maxlen=trail_length)
+
 
 def init():
     line.set_data([], [])
+    trail_line.set_data([], [])
     time_text.set_text('')
-    return line, time_text
+    return line, trail_line, time_text
 
 
 def animate(i):
@@ -91,8 +304,31 @@ def animate(i):
     time_text.set_text(time_template % (i*dt))
     return line, time_text
 
-ani = animation.FuncAnimation(fig, animate, np.arange(1, len(y)),
-                              interval=25, blit=True, init_func=init)
 
-# ani.save('double_pendulum.mp4', fps=15)
-plt.show()
\ No newline at end of file
+def animate_stream(frame):
+    time, x1_, y1_, x2_, y2_ = frame
+    trail.append((x2_, y2_))
+
+    line.set_data([0, x1_, x2_], [0, y1_, y2_])
+    trail_line.set_data([p[0] for p in trail], [p[1] for p in trail])
+    time_text.set_text(time_template % time)
+    return line, trail_line, time_text
+
+if streaming:
+    # a finite number of frames is needed to write a file, a live window
+    # can run forever
+    n_frames = len(t) if save_file is not None else None
+    ani = animation.FuncAnimation(fig, animate_stream,
+                                  partial(pendulum_frames, state, dt,
+                                          integrator, n_frames),
+                                  interval=25, blit=True, init_func=init,
+                                  save_count=n_frames, cache_frame_data=False)
+else:
+    ani = animation.FuncAnimation(fig, animate, np.arange(1, len(y)),
+                                  interval=25, blit=True, init_func=init)
+
+if save_file is not None:
+    writer = 'pillow' if save_file.endswith('.gif') else 'ffmpeg'
+    ani.save(save_file, writer=writer, fps=15)
+else:
+    plt.show()
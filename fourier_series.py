@@ -0,0 +1,176 @@
+import numpy as np
+
+
+"""
+Fourier series of arbitrary periodic signals.
+Instead of a hard-coded formula like the one for the rectangular pulse in plot_fourier_series.py, the coefficients
+are computed from samples of one period with the fast fourier transform (numpy.fft.rfft). This costs O(n log n)
+for n samples, independent of the number of terms used afterwards.
+The series is written as f(x) = c_0 + 2 * sum over k >= 1 of Re(c_k * exp(i * k * w * x)) with w = 2 pi / period."""
+
+
+def sample_periodic(func, n, period=2 * np.pi, x0=0.0):
+    """
+    :param func:
+        callable, evaluated on an array of x values
+    :param n:
+        Number of samples
+    :param period:
+        Period of func
+    :param x0:
+        Start of the sampled period
+    :return:
+        x values (one period, endpoint excluded) and the samples func(x)
+    """
+    x = x0 + period * np.arange(n) / n
+    return x, np.asarray(func(x), dtype=np.float64)
+
+
+def fourier_coefficients(y, period=2 * np.pi, x0=0.0, n=2 ** 12):
+    """
+    :param y:
+        array like or callable. Samples of exactly one period on an equidistant grid starting at x0, endpoint
+        excluded. A callable is sampled with n points first.
+    :param period:
+        Period of the signal
+    :param x0:
+        x value of the first sample
+    :param n:
+        Number of samples taken if y is a callable
+    :return:
+        complex coefficients c_0 ... c_K with K = (n - 1) // 2, referring to the origin x = 0.
+        For an even number of samples the Nyquist term cannot be resolved and is dropped.
+    """
+    if callable(y):
+        _, y = sample_periodic(y, n, period, x0)
+    y = np.asarray(y, dtype=np.float64)
+    c = np.fft.rfft(y)[:(len(y) - 1) // 2 + 1] / len(y)
+    if x0 != 0:
+        # the fft refers to the first sample, shift the phases to x = 0
+        k = np.arange(len(c))
+        c *= np.exp(-2j * np.pi * k * x0 / period)
+    return c
+
+
+def sine_cosine_coefficients(c):
+    """
+    :param c:
+        complex coefficients from fourier_coefficients
+    :return:
+        a, b with f(x) = a_0 + sum over k >= 1 of a_k cos(k w x) + b_k sin(k w x)
+    """
+    a = 2 * c.real
+    b = -2 * c.imag
+    a[0] = c[0].real
+    b[0] = 0
+    return a, b
+
+
+def partial_sum(c, x, depth, period=2 * np.pi):
+    """
+    :param c:
+        complex coefficients from fourier_coefficients
+    :param x:
+        array like. Arbitrary x values the series is evaluated at
+    :param depth:
+        Number of terms k = 1 ... depth used (in addition to the mean c_0)
+    :param period:
+        Period of the signal
+    :return:
+        partial sum of the series at x, costs O(depth * len(x))
+    """
+    x = np.asarray(x, dtype=np.float64)
+    depth = min(depth, len(c) - 1)
+    k = np.arange(1, depth + 1)[:, np.newaxis]
+    terms = c[1:depth + 1, np.newaxis] * np.exp(2j * np.pi / period * k * x)
+    return c[0].real + 2 * terms.real.sum(axis=0)
+
+
+def partial_sum_on_grid(c, depth, n, period=2 * np.pi, x0=0.0):
+    """
+    :param c:
+        complex coefficients from fourier_coefficients
+    :param depth:
+        int or sequence of ints. Number of terms k = 1 ... depth used (in addition to the mean c_0)
+    :param n:
+        Number of points of the grid x0 + period * j / n, j = 0 ... n - 1. May be larger than the number of
+        samples used for the coefficients (oversampling)
+    :param period:
+        Period of the signal
+    :param x0:
+        Start of the grid
+    :return:
+        partial sum on the grid via the inverse fft, O(n log n) per depth. For a sequence of depths a
+        (len(depth), n) array with one partial sum per row
+    """
+    depths = np.atleast_1d(depth)
+    k = np.arange(len(c))
+    shifted = c * np.exp(2j * np.pi * k * x0 / period)
+
+    spectrum = np.zeros((len(depths), n // 2 + 1), dtype=complex)
+    kmax = min(len(c), n // 2 + 1)
+    spectrum[:, :kmax] = shifted[:kmax]
+    spectrum[np.arange(n // 2 + 1) > depths[:, np.newaxis]] = 0
+    if n % 2 == 0 and kmax == n // 2 + 1:
+        # irfft only uses the real part of the Nyquist term, which has weight 1 instead of 2
+        spectrum[:, -1] *= 2
+    sums = np.fft.irfft(spectrum * n, n, axis=1)
+    return sums if np.ndim(depth) else sums[0]
+
+
+def convergence_metrics(y, depths, period=2 * np.pi, x0=0.0, oversample=8):
+    """
+    :param y:
+        array like. Samples of exactly one period, see fourier_coefficients
+    :param depths:
+        sequence of ints. Depths the partial sums are analysed for
+    :param period:
+        Period of the signal
+    :param x0:
+        x value of the first sample
+    :param oversample:
+        the overshoot is measured on a grid this many times finer than the samples, because the
+        Gibbs maxima lie between the sample points
+    :return:
+        dict with arrays (one entry per depth) 'rms_error' and 'max_error' of the partial sums at the samples
+        and 'overshoot', the maximum exceeding max(y) relative to the range max(y) - min(y)
+        (about 0.09 for the Gibbs phenomenon at a jump)
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    c = fourier_coefficients(y, period, x0)
+
+    at_samples = partial_sum_on_grid(c, depths, n, period, x0)
+    error = at_samples - y
+    fine = partial_sum_on_grid(c, depths, oversample * n, period, x0)
+    value_range = y.max() - y.min()
+
+    return {'rms_error': np.sqrt(np.mean(error ** 2, axis=1)),
+            'max_error': np.abs(error).max(axis=1),
+            'overshoot': (fine.max(axis=1) - y.max()) / value_range if value_range else np.zeros(len(depths))}
+
+
+if __name__ == '__main__':
+    # reference test case: the rectangular pulse of plot_fourier_series.py, whose series is known
+    from plot_fourier_series import rechteck_puls, fourier_rechteck_partial_sums
+
+    n = 2 ** 14
+    x, pulse = sample_periodic(rechteck_puls, n, x0=-np.pi)
+    c = fourier_coefficients(pulse, x0=-np.pi)
+
+    a, b = sine_cosine_coefficients(c)
+    k = np.arange(1, 20, 2)
+    print('b_k for odd k:   ', np.round(b[k], 4))
+    print('4 / (pi k):      ', np.round(4 / (np.pi * k), 4))
+
+    # depth d of the formula uses the harmonics 1, 3, ..., 2d - 1
+    x_test = np.linspace(-2 * np.pi, 2 * np.pi, 101)
+    fft_sum = partial_sum(c, x_test, 2 * 10 - 1)
+    formula_sum = fourier_rechteck_partial_sums(x_test, depth=10)[-1]
+    print('max deviation from formula (depth 10): {:.2e}'.format(np.abs(fft_sum - formula_sum).max()))
+
+    depths = [1, 5, 25, 125, 625]
+    metrics = convergence_metrics(pulse, depths, x0=-np.pi)
+    for i, d in enumerate(depths):
+        print('depth {:4d}: rms error {:.4f}, max error {:.4f}, overshoot {:.4f}'.format(
+            d, metrics['rms_error'][i], metrics['max_error'][i], metrics['overshoot'][i]))
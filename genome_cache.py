@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar binary cache of the genome tables used in panda_test.py
+
+On the first load the TSV is parsed once (in chunks) and every column is
+written to a raw binary file next to it, in the directory <tsv>.cache.
+Numeric columns are stored as float64 arrays, text columns as one
+concatenated UTF-8 byte buffer plus int64 offsets. Later loads memory map
+these files, which takes milliseconds independent of the table size.
+
+The cache is keyed on the size and modification time of the TSV and
+optionally on its SHA-1 hash. It is rebuilt whenever the key changes.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import genome_stats
+
+CACHE_VERSION = 1
+
+
+def file_key(path, with_hash=False):
+    """
+    Returns the dict identifying the current content of the file at path.
+    """
+    stat = os.stat(path)
+    key = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+    if with_hash:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(block)
+        key['sha1'] = sha1.hexdigest()
+    return key
+
+
+def cache_directory(path):
+    return path + '.cache'
+
+
+def build_cache(path, directory=None, with_hash=False, chunksize=100000):
+    """
+    Parses the TSV at path chunk by chunk and writes the columnar cache.
+
+    The file meta.json is written last, so an interrupted build is never
+    mistaken for a valid cache.
+    """
+    directory = directory or cache_directory(path)
+    os.makedirs(directory, exist_ok=True)
+    meta_path = os.path.join(directory, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    text_columns = [c for c in genome_stats.COLUMNS
+                    if genome_stats.DTYPES[c] is str]
+    files = {}
+    for c in genome_stats.COLUMNS:
+        if c in text_columns:
+            files[c] = (open(os.path.join(directory, c + '.bytes.bin'), 'wb'),
+                        open(os.path.join(directory, c + '.offsets.bin'), 'wb'))
+        else:
+            files[c] = open(os.path.join(directory, c + '.bin'), 'wb')
+
+    rows = 0
+    ends = dict.fromkeys(text_columns, 0)
+    try:
+        for c in text_columns:
+            files[c][1].write(np.zeros(1, dtype=np.int64).tobytes())
+
+        for chunk in genome_stats.read_genome_chunks(
+                path, columns=genome_stats.COLUMNS, chunksize=chunksize):
+            rows += len(chunk)
+            for c in genome_stats.COLUMNS:
+                if c in text_columns:
+                    encoded = [s.encode('utf-8') for s in chunk[c]]
+                    lengths = np.fromiter(map(len, encoded), dtype=np.int64,
+                                          count=len(encoded))
+                    offsets = ends[c] + np.cumsum(lengths)
+                    if len(offsets):
+                        ends[c] = int(offsets[-1])
+                    files[c][0].write(b''.join(encoded))
+                    files[c][1].write(offsets.tobytes())
+                else:
+                    files[c].write(chunk[c].to_numpy(dtype=np.float64).tobytes())
+    finally:
+        for f in files.values():
+            for handle in (f if isinstance(f, tuple) else (f,)):
+                handle.close()
+
+    meta = {'version': CACHE_VERSION,
+            'key': file_key(path, with_hash),
+            'rows': rows,
+            'text columns': text_columns}
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def _memmap(filename, dtype):
+    # np.memmap cannot map empty files
+    if os.path.getsize(filename) == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode='r')
+
+
+class TextColumn:
+    """
+    Strings stored as one byte buffer and offsets, decoded only on access.
+
+    String i is buffer[offsets[i]:offsets[i + 1]]. buffer and offsets can be
+    passed directly to genome_stats.buffer_composition().
+    """
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def to_series(self, rows=None):
+        """
+        Decodes the first rows strings (all by default) in a Series.
+        """
+        rows = len(self) if rows is None else min(rows, len(self))
+        return pd.Series([self[i] for i in range(rows)], dtype=object)
+
+
+class GenomeTable:
+    """
+    Memory mapped columns of a cached genome table.
+
+    Numeric columns are NumPy arrays, text columns TextColumn objects.
+    """
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def to_dataframe(self, columns=None, rows=None):
+        """
+        Returns the table (or only the given columns, or only the first rows)
+        as a DataFrame, like the one read with pd.read_csv in panda_test.py.
+
+        The text columns are decoded string by string, for statistics over
+        the whole table use the mapped columns directly.
+        """
+        columns = columns or genome_stats.COLUMNS
+        data = {}
+        for c in columns:
+            if isinstance(self.columns[c], TextColumn):
+                data[c] = self.columns[c].to_series(rows)
+            else:
+                data[c] = np.asarray(self.columns[c][:rows])
+        return pd.DataFrame(data, columns=columns)
+
+
+def load_genome(path, directory=None, with_hash=False, rebuild=False):
+    """
+    Loads the genome table at path from its cache, building the cache first
+    if it is missing or out of date.
+    """
+    directory = directory or cache_directory(path)
+    meta_path = os.path.join(directory, 'meta.json')
+
+    meta = None
+    if not rebuild and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        key = file_key(path, with_hash='sha1' in meta['key'] or with_hash)
+        if meta['version'] != CACHE_VERSION or meta['key'] != key:
+            meta = None
+    if meta is None:
+        meta = build_cache(path, directory, with_hash)
+
+    columns = {}
+    for c in genome_stats.COLUMNS:
+        if c in meta['text columns']:
+            columns[c] = TextColumn(
+                _memmap(os.path.join(directory, c + '.bytes.bin'), np.uint8),
+                _memmap(os.path.join(directory, c + '.offsets.bin'), np.int64))
+        else:
+            columns[c] = _memmap(os.path.join(directory, c + '.bin'), np.float64)
+    return GenomeTable(columns, meta['rows'])
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+K-mer counting and k-mer index for the sequences of the genome tables
+
+Every base is encoded with 2 bits (A = 0, C = 1, G = 2, T/U = 3), a k-mer is
+the integer made of the codes of its k bases. K-mers containing any other
+character (e.g. N) and k-mers crossing the border between two sequences are
+skipped.
+"""
+
+import numpy as np
+
+import genome_stats
+
+KMER_BASES = 'ACGT'
+
+# 2 bit code of every byte, 4 for characters that are not a base
+BASE_BITS = np.full(256, 4, dtype=np.uint8)
+for code, base in enumerate(KMER_BASES):
+    BASE_BITS[ord(base)] = code
+    BASE_BITS[ord(base.lower())] = code
+BASE_BITS[ord('U')] = BASE_BITS[ord('u')] = 3
+
+# up to this k the spectrum is counted densely with np.bincount (4 ** 12 bins)
+MAX_DENSE_K = 12
+
+
+def encode_kmer(kmer):
+    """
+    Returns the integer code of the string kmer.
+    """
+    code = 0
+    for base in kmer:
+        bits = BASE_BITS[ord(base)]
+        if bits > 3:
+            raise ValueError("'{}' is not a base".format(base))
+        code = (code << 2) | int(bits)
+    return code
+
+
+def decode_kmer(code, k):
+    """
+    Returns the string of the k-mer with the integer code.
+    """
+    return ''.join(KMER_BASES[(int(code) >> (2 * (k - 1 - i))) & 3]
+                   for i in range(k))
+
+
+def kmer_codes(buffer, offsets, k):
+    """
+    Computes the codes of all k-mers of the sequences
+    buffer[offsets[i]:offsets[i + 1]].
+
+    The codes are built for all positions at once: in k steps the code is
+    shifted by 2 bits and the next base is added. Returns the int64 codes and
+    the index of the sequence every k-mer belongs to.
+    """
+    if not 0 < k <= 31:
+        raise ValueError('k has to be between 1 and 31')
+    offsets = np.asarray(offsets, dtype=np.int64)
+    bits = BASE_BITS[np.frombuffer(buffer, dtype=np.uint8)[:offsets[-1]]]
+    n = len(bits) - k + 1
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    codes = np.zeros(n, dtype=np.int64)
+    for j in range(k):
+        codes <<= 2
+        codes |= bits[j:j + n] & 3
+
+    # a k-mer starting at i is valid if there is no invalid base in
+    # [i, i + k) and no sequence starts in (i, i + k)
+    invalid = np.zeros(len(bits) + 1, dtype=np.int64)
+    np.cumsum(bits > 3, out=invalid[1:])
+    starts = np.zeros(len(bits) + 1, dtype=np.int64)
+    starts[offsets[1:-1]] = 1
+    starts = np.cumsum(starts)
+    positions = np.arange(n)
+    valid = ((invalid[positions + k] - invalid[positions] == 0)
+             & (starts[positions + k - 1] == starts[positions]))
+
+    positions = positions[valid]
+    sequence = np.searchsorted(offsets, positions, side='right') - 1
+    return codes[valid], sequence
+
+
+def kmer_spectrum(sequences=None, k=3, buffer=None, offsets=None):
+    """
+    Counts the k-mers of all sequences (a column of sequences or a byte
+    buffer with offsets, e.g. a genome_cache.TextColumn).
+
+    For k <= MAX_DENSE_K the counts of all 4 ** k k-mers are returned as one
+    array indexed by the k-mer code. For larger k only the k-mers occurring
+    are returned, as sorted codes and their counts.
+    """
+    if sequences is not None:
+        buffer, offsets = genome_stats.to_buffer(sequences)
+    codes, _ = kmer_codes(buffer, offsets, k)
+    if k <= MAX_DENSE_K:
+        return np.bincount(codes, minlength=4 ** k)
+    return np.unique(codes, return_counts=True)
+
+
+class KmerIndex:
+    """
+    Inverted index k-mer -> sequences for motif queries.
+
+    The distinct (k-mer, sequence) pairs are stored sorted by k-mer, so the
+    sequences containing a k-mer are found by binary search. A motif of at
+    least k bases is searched by intersecting the sequences of its k-mers and
+    checking only the remaining candidates.
+    """
+
+    def __init__(self, sequences=None, k=8, buffer=None, offsets=None, ids=None):
+        if sequences is not None:
+            buffer, offsets = genome_stats.to_buffer(sequences)
+        self.k = k
+        self.buffer = buffer
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.ids = None if ids is None else np.asarray(ids)
+
+        codes, sequence = kmer_codes(buffer, offsets, k)
+        # sort by code, then by sequence, and remove duplicate pairs
+        order = np.lexsort((sequence, codes))
+        codes, sequence = codes[order], sequence[order]
+        distinct = np.ones(len(codes), dtype=bool)
+        distinct[1:] = (codes[1:] != codes[:-1]) | (sequence[1:] != sequence[:-1])
+        self.codes = codes[distinct]
+        self.sequences = sequence[distinct]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def sequence(self, i):
+        return bytes(self.buffer[self.offsets[i]:self.offsets[i + 1]]).decode('ascii')
+
+    def with_kmer(self, kmer):
+        """
+        Returns the indices of the sequences containing the k-mer.
+        """
+        if len(kmer) != self.k:
+            raise ValueError('the k-mer has to have {} bases'.format(self.k))
+        code = encode_kmer(kmer)
+        first, last = np.searchsorted(self.codes, [code, code + 1])
+        return self.sequences[first:last]
+
+    def find(self, motif):
+        """
+        Returns the indices (or ids, if given) of the sequences containing
+        the motif. Motifs shorter than k or containing other characters than
+        bases are found by scanning all sequences.
+        """
+        motif = motif.upper().replace('U', 'T')
+        if len(motif) < self.k or any(base not in KMER_BASES for base in motif):
+            candidates = range(len(self))
+        else:
+            candidates = self.with_kmer(motif[:self.k])
+            for i in range(1, len(motif) - self.k + 1):
+                if len(candidates) == 0:
+                    break
+                candidates = np.intersect1d(
+                    candidates, self.with_kmer(motif[i:i + self.k]),
+                    assume_unique=True)
+
+        found = np.array([i for i in candidates
+                          if motif in self.sequence(i).upper().replace('U', 'T')],
+                         dtype=np.int64)
+        if self.ids is not None:
+            return self.ids[found].tolist()
+        return found
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Genome statistics over large sequence collections on several processes
+
+The sequences are stored once as a byte buffer plus offsets in shared
+memory, so the worker processes read them without copying or pickling.
+Every worker computes the statistics of one partition of the sequences,
+the partial results are merged afterwards.
+"""
+
+from multiprocessing import Pool, cpu_count, shared_memory
+
+import numpy as np
+import pandas as pd
+
+import genome_stats
+
+
+def empty_stats():
+    return {'sequences': 0,
+            'base counts': dict.fromkeys(genome_stats.BASES, 0),
+            'missing sequences': 0,
+            'length sum': 0,
+            'min length': None,
+            'max length': None}
+
+
+def merge_stats(a, b):
+    """
+    Merges two partial statistics as returned by partition_stats().
+    """
+    lengths_min = [x for x in (a['min length'], b['min length']) if x is not None]
+    lengths_max = [x for x in (a['max length'], b['max length']) if x is not None]
+    return {'sequences': a['sequences'] + b['sequences'],
+            'base counts': {base: a['base counts'][base] + b['base counts'][base]
+                            for base in genome_stats.BASES},
+            'missing sequences': a['missing sequences'] + b['missing sequences'],
+            'length sum': a['length sum'] + b['length sum'],
+            'min length': min(lengths_min) if lengths_min else None,
+            'max length': max(lengths_max) if lengths_max else None}
+
+
+def partition_stats(buffer, offsets):
+    """
+    Statistics of the sequences buffer[offsets[i]:offsets[i + 1]].
+    """
+    stats = empty_stats()
+    if len(offsets) < 2:
+        return stats
+
+    offsets = np.asarray(offsets, dtype=np.int64)
+    start = offsets[0]
+    composition = genome_stats.buffer_composition(
+        buffer[start:offsets[-1]], offsets - start)
+    lengths = composition['length']
+
+    stats['sequences'] = len(composition)
+    stats['base counts'] = {base: int(composition[base].sum())
+                            for base in genome_stats.BASES}
+    stats['missing sequences'] = int(composition['GC content'].isna().sum())
+    stats['length sum'] = int(lengths.sum())
+    stats['min length'] = int(lengths.min())
+    stats['max length'] = int(lengths.max())
+    return stats
+
+
+def _worker(args):
+    name, size, offsets_name, n_offsets, first, last = args
+    buffer_memory = shared_memory.SharedMemory(name=name)
+    offsets_memory = shared_memory.SharedMemory(name=offsets_name)
+    buffer = np.ndarray((size,), dtype=np.uint8, buffer=buffer_memory.buf)
+    offsets = np.ndarray((n_offsets,), dtype=np.int64,
+                         buffer=offsets_memory.buf)
+    try:
+        return partition_stats(buffer, offsets[first:last + 1])
+    finally:
+        # the views have to be released before the memory can be closed
+        del buffer, offsets
+        buffer_memory.close()
+        offsets_memory.close()
+
+
+def partition(offsets, parts):
+    """
+    Splits the sequences into at most parts contiguous partitions with about
+    the same number of bytes. Returns the boundaries as sequence indices.
+    """
+    offsets = np.asarray(offsets)
+    targets = np.linspace(offsets[0], offsets[-1], parts + 1)
+    bounds = np.searchsorted(offsets, targets)
+    bounds[0], bounds[-1] = 0, len(offsets) - 1
+    return np.unique(bounds)
+
+
+def parallel_stats(sequences=None, buffer=None, offsets=None, processes=None,
+                   parts_per_process=4):
+    """
+    Computes the statistics of streaming_stats() for a sequence column on a
+    process pool.
+
+    Either a column of sequences or a byte buffer with offsets (e.g. a
+    genome_cache.TextColumn, or several organisms joined together) is
+    analysed. Returns a dict with the number of sequences, the base counts,
+    the number of missing sequences and the mean, minimum and maximum
+    sequence length.
+    """
+    if sequences is not None:
+        buffer, offsets = genome_stats.to_buffer(sequences)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    processes = processes or cpu_count()
+
+    buffer_memory = shared_memory.SharedMemory(create=True,
+                                               size=max(1, len(buffer)))
+    offsets_memory = shared_memory.SharedMemory(create=True,
+                                                size=offsets.nbytes)
+    try:
+        np.ndarray((len(buffer),), dtype=np.uint8,
+                   buffer=buffer_memory.buf)[:] = np.frombuffer(buffer, dtype=np.uint8)
+        np.ndarray(offsets.shape, dtype=np.int64,
+                   buffer=offsets_memory.buf)[:] = offsets
+
+        bounds = partition(offsets, processes * parts_per_process)
+        tasks = [(buffer_memory.name, len(buffer), offsets_memory.name,
+                  len(offsets), first, last)
+                 for first, last in zip(bounds[:-1], bounds[1:])]
+        with Pool(processes) as pool:
+            results = pool.map(_worker, tasks)
+    finally:
+        buffer_memory.close()
+        buffer_memory.unlink()
+        offsets_memory.close()
+        offsets_memory.unlink()
+
+    stats = empty_stats()
+    for result in results:
+        stats = merge_stats(stats, result)
+
+    stats['mean length'] = (stats['length sum'] / stats['sequences']
+                            if stats['sequences'] else np.nan)
+    return stats
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(0)
+    collection = pd.Series([''.join(rng.choice(list('ACGT'), 2000))
+                            for _ in range(2000)] * 25)
+
+    for processes in (1, cpu_count()):
+        start = time.time()
+        result = parallel_stats(collection, processes=processes)
+        print('{} processes: {:.2f} s, A = {}'.format(
+            processes, time.time() - start, result['base counts']['A']))
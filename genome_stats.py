@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Statistics over the genome tables used in panda_test.py
+
+The table is read in chunks, only with the needed columns and with explicit
+dtypes, so that files larger than the memory can be analysed.
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ['Art', 'id', 'systematic', 'standard', 'function', 'sequence',
+           'gen length', 'seq mRNA', 'mRNA length']
+
+# lengths are read as floats, so that missing values (NaN) do not break the parsing
+DTYPES = {'Art': str, 'id': str, 'systematic': str, 'standard': str,
+          'function': str, 'sequence': str, 'gen length': np.float64,
+          'seq mRNA': str, 'mRNA length': np.float64}
+
+BASES = ['A', 'C', 'G', 'T', 'N']
+
+
+def read_genome_chunks(path, columns=('sequence', 'mRNA length'),
+                       chunksize=10000):
+    """
+    Reads the tab separated genome table in chunks of chunksize rows.
+
+    Only the given columns are parsed, every chunk is a DataFrame with these
+    columns. Missing sequences are returned as empty strings.
+    """
+    columns = list(columns)
+    reader = pd.read_csv(path, sep="\t", header=None, names=COLUMNS,
+                         usecols=columns,
+                         dtype={c: DTYPES[c] for c in columns},
+                         chunksize=chunksize)
+    for chunk in reader:
+        for c in columns:
+            if DTYPES[c] is str:
+                chunk[c] = chunk[c].fillna('')
+        yield chunk
+
+
+def base_composition(sequences, ignore_case=True):
+    """
+    Counts A, C, G, T and N for a whole column of sequences at once.
+
+    All sequences are joined into one byte buffer and counted with
+    buffer_composition(). Missing values are treated as empty sequences.
+
+    Returns a DataFrame with the index of sequences and the columns A, C, G,
+    T, N, 'other', 'length' and 'GC content' ((G + C) / (A + C + G + T),
+    NaN for sequences without any of these bases).
+    """
+    sequences = pd.Series(sequences)
+    buffer, offsets = to_buffer(sequences)
+    return buffer_composition(buffer, offsets, index=sequences.index,
+                              ignore_case=ignore_case)
+
+
+def to_buffer(sequences):
+    """
+    Joins a column of sequences into one ASCII byte buffer.
+
+    Returns the buffer and the int64 offsets, sequence i is
+    buffer[offsets[i]:offsets[i + 1]]. Missing values become empty sequences.
+    """
+    sequences = pd.Series(sequences).fillna('')
+    offsets = np.zeros(len(sequences) + 1, dtype=np.int64)
+    np.cumsum(sequences.str.len().to_numpy(dtype=np.int64), out=offsets[1:])
+    return ''.join(sequences).encode('ascii', errors='replace'), offsets
+
+
+def buffer_composition(buffer, offsets, index=None, ignore_case=True):
+    """
+    Counts A, C, G, T and N of sequences stored as one byte buffer.
+
+    Sequence i is buffer[offsets[i]:offsets[i + 1]]. The buffer is viewed as
+    a NumPy array, every base is counted with one comparison over the whole
+    buffer and a sum over the segments belonging to the genes. Lower case
+    letters (soft masked regions) are counted like upper case ones and U
+    (RNA) like T. With ignore_case=False only the upper case letters A, C,
+    G, T and N are counted, the others are 'other'.
+
+    Returns the same DataFrame as base_composition().
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    lengths = np.diff(offsets)
+    upper = np.frombuffer(buffer, dtype=np.uint8)
+    if ignore_case:
+        # clearing bit 5 turns ASCII lower case letters into upper case ones
+        upper = upper & 0xDF
+
+    counts = np.zeros((len(lengths), len(BASES)), dtype=np.int64)
+    # reduceat needs strictly increasing start indices, so empty sequences
+    # are left out (their counts stay 0)
+    nonempty = lengths > 0
+    starts = offsets[:-1][nonempty]
+    if len(starts):
+        # reduceat sums up to the end of the array for the last start index
+        upper = upper[:offsets[-1]]
+        for i, base in enumerate(BASES):
+            is_base = upper == ord(base)
+            if base == 'T' and ignore_case:
+                is_base |= upper == ord('U')
+            counts[nonempty, i] = np.add.reduceat(is_base.view(np.uint8),
+                                                  starts, dtype=np.int32)
+
+    composition = pd.DataFrame(counts, index=index, columns=BASES)
+    composition['other'] = lengths - counts.sum(axis=1)
+    composition['length'] = lengths
+    acgt = composition[['A', 'C', 'G', 'T']].sum(axis=1)
+    composition['GC content'] = (composition['G'] + composition['C']) / acgt.where(acgt > 0)
+    return composition
+
+
+def streaming_stats(path, chunksize=10000, ignore_case=True):
+    """
+    Computes the statistics of panda_test.py chunk by chunk in bounded memory.
+
+    Returns a dict with the number of genes, the mean mRNA length, the counts
+    of every base in the column 'sequence' and the number of missing
+    sequences (sequences without any A, C, G or T). ignore_case as in
+    buffer_composition().
+    """
+    genes = 0
+    length_sum = 0.0
+    length_count = 0
+    base_counts = dict.fromkeys(BASES, 0)
+    missing = 0
+
+    for chunk in read_genome_chunks(path, chunksize=chunksize):
+        genes += len(chunk)
+
+        lengths = chunk['mRNA length']
+        length_sum += lengths.sum()
+        length_count += lengths.count()
+
+        composition = base_composition(chunk['sequence'], ignore_case=ignore_case)
+        for base in BASES:
+            base_counts[base] += int(composition[base].sum())
+        missing += int(composition['GC content'].isna().sum())
+
+    return {'genes': genes,
+            'mean mRNA length': length_sum / length_count if length_count else np.nan,
+            'base counts': base_counts,
+            'missing sequences': missing}
@@ -7,24 +7,27 @@
 # Push the solution in your repo
 
 
+import numpy as np
+
+
 def rock_paper_scissors(user_input, computer_input):
-    if user_input is 'rock' and computer_input is 'paper':
+    if user_input == 'rock' and computer_input == 'paper':
         return 'computer wins'
-    elif user_input is 'rock' and computer_input is 'scissors':
+    elif user_input == 'rock' and computer_input == 'scissors':
         return 'you win'
-    elif user_input is 'rock' and computer_input is 'rock':
+    elif user_input == 'rock' and computer_input == 'rock':
         return 'tied game'
-    elif user_input is 'paper' and computer_input is 'paper':
+    elif user_input == 'paper' and computer_input == 'paper':
         return 'tied game'
-    elif user_input is 'paper' and computer_input is 'scissors':
+    elif user_input == 'paper' and computer_input == 'scissors':
         return 'computer wins'
-    elif user_input is 'paper' and computer_input is 'rock':
+    elif user_input == 'paper' and computer_input == 'rock':
         return 'you win'
-    elif user_input is 'scissors' and computer_input is 'paper':
+    elif user_input == 'scissors' and computer_input == 'paper':
         return 'you win'
-    elif user_input is 'scissors' and computer_input is 'scissors':
+    elif user_input == 'scissors' and computer_input == 'scissors':
         return 'tied game'
-    elif user_input is 'scissors' and computer_input is 'rock':
+    elif user_input == 'scissors' and computer_input == 'rock':
         return 'computer wins'
 
 
@@ -36,9 +39,80 @@ def rock_paper_scissors_2(user_input, computer_input):
     return rules[user_input][computer_input]
 
 
+# outcome codes of the batch API
+TIED, USER_WINS, COMPUTER_WINS = 0, 1, 2
+OUTCOMES = np.array(['tied game', 'you win', 'computer wins'])
+
+
+class CyclicGame:
+    """
+    Rock, paper, scissors with any odd number n of moves. The moves are
+    ordered so that every move beats the (n - 1) / 2 moves before it
+    (cyclically): with d = (user - computer) % n the game is tied for d = 0
+    and won by the user for 1 <= d <= (n - 1) / 2. The rule is precomputed
+    as n x n table of outcome codes, so evaluating a round is one lookup.
+    """
+
+    def __init__(self, moves):
+        if len(moves) % 2 == 0:
+            raise ValueError('A cyclic game needs an odd number of moves')
+        self.moves = list(moves)
+        self.codes = {move: code for code, move in enumerate(self.moves)}
+        n = len(self.moves)
+        d = (np.arange(n)[:, np.newaxis] - np.arange(n)[np.newaxis, :]) % n
+        self.table = np.where(d == 0, TIED,
+                              np.where(d <= (n - 1) // 2, USER_WINS, COMPUTER_WINS)).astype(np.int8)
+
+    def encode(self, moves):
+        """
+        Move names to codes, every distinct name is looked up only once.
+        Integer arrays are taken as codes already.
+        """
+        moves = np.asarray(moves)
+        if moves.dtype.kind in 'iu':
+            outside = (moves < 0) | (moves >= len(self.moves))
+            if outside.any():
+                raise ValueError('Unknown move codes: {}'.format(
+                    ', '.join(str(code) for code in np.unique(moves[outside]))))
+            return moves.astype(np.int8)
+        unique, inverse = np.unique(moves, return_inverse=True)
+        unknown = [move for move in unique if move not in self.codes]
+        if unknown:
+            raise ValueError('Unknown moves: {}'.format(', '.join(unknown)))
+        codes = np.array([self.codes[move] for move in unique], dtype=np.int8)
+        return codes[inverse].reshape(moves.shape)
+
+    def evaluate(self, user_inputs, computer_inputs):
+        """
+        Outcome codes (TIED, USER_WINS, COMPUTER_WINS) of arrays of moves.
+        """
+        return self.table[self.encode(user_inputs), self.encode(computer_inputs)]
+
+    def outcomes(self, user_inputs, computer_inputs):
+        """
+        Outcomes as strings, like rock_paper_scissors_2.
+        """
+        return OUTCOMES[self.evaluate(user_inputs, computer_inputs)]
+
+
+ROCK_PAPER_SCISSORS = CyclicGame(['rock', 'paper', 'scissors'])
+ROCK_PAPER_SCISSORS_LIZARD_SPOCK = CyclicGame(['rock', 'Spock', 'paper', 'lizard', 'scissors'])
+
+
+def rock_paper_scissors_batch(user_inputs, computer_inputs, game=ROCK_PAPER_SCISSORS):
+    return game.evaluate(user_inputs, computer_inputs)
+
+
 if __name__ == "__main__":
     possibilities = ['rock', 'paper', 'scissors']
     for user_choice in possibilities:
         for computer_choice in possibilities:
             if user_choice == computer_choice:
                 assert rock_paper_scissors(user_choice, computer_choice) == 'tied game'
+                assert rock_paper_scissors_2(user_choice, computer_choice) == 'tied game'
+
+    users, computers = zip(*[(user_choice, computer_choice)
+                             for user_choice in possibilities
+                             for computer_choice in possibilities])
+    assert list(OUTCOMES[rock_paper_scissors_batch(users, computers)]) == \
+        [rock_paper_scissors_2(user, computer) for user, computer in zip(users, computers)]
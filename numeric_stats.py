@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Mean and median for arrays and for data streams too large for the memory
+
+Arrays (including memory maps like the ones written by random_gen.write_npy)
+are handled by NumPy. Iterables are consumed in one pass: the mean exactly
+with StreamingMean, the median approximately with a t-digest (Dunning),
+which keeps only a bounded number of centroids in memory.
+
+NaN is handled the same way on every path, as by np.mean and np.median: a
+single NaN in the data makes the mean and the median NaN.
+"""
+
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class StreamingMean:
+    """
+    Mean of a stream of values or blocks of values, updated in O(1) memory.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = np.nan
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return self
+        count = self.count + len(values)
+        block_mean = values.mean()
+        if self.count == 0:
+            self.mean = block_mean
+        else:
+            # weighted update, numerically stable also for many blocks
+            self.mean += (block_mean - self.mean) * len(values) / count
+        self.count = count
+        return self
+
+
+class TDigest:
+    """
+    Approximate quantiles of a stream with a merging t-digest.
+
+    The values are summarised by at most about `compression` centroids (mean
+    and weight). Every block of new values is sorted together with the
+    centroids and merged again, all centroids whose cumulative weight falls
+    into the same interval of the scale function
+    k(q) = compression / pi * arcsin(2 q - 1) / 2 become one centroid. The
+    intervals are narrow near q = 0 and q = 1, so the tails are kept
+    precisely.
+
+    Every merge loses some information, so the result depends on how the
+    data is split into blocks: many small blocks give a larger error than
+    a few large ones, the error of the median for rows of 50 values can be
+    ten times the error for blocks of 10^6 values.
+    Updates should therefore get blocks as large as the memory allows.
+    """
+
+    def __init__(self, compression=1000):
+        self.compression = compression
+        self.means = np.zeros(0)
+        self.weights = np.zeros(0)
+        # NaN values are not merged, but make every quantile NaN
+        self.has_nan = False
+
+    @property
+    def count(self):
+        return int(self.weights.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        nan = np.isnan(values)
+        if nan.any():
+            self.has_nan = True
+            values = values[~nan]
+        if len(values) == 0:
+            return self
+
+        means = np.concatenate([self.means, values])
+        weights = np.concatenate([self.weights, np.ones(len(values))])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / np.pi * np.arcsin(2 * q - 1) / 2
+        groups = np.floor(k - k[0]).astype(np.int64)
+
+        self.weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=means * weights)
+        filled = self.weights > 0
+        self.weights = self.weights[filled]
+        self.means = self.means[filled] / self.weights
+        return self
+
+    def quantile(self, p):
+        if len(self.weights) == 0 or self.has_nan:
+            return np.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(p * self.weights.sum(), centers, self.means))
+
+
+def exact_median(values):
+    """
+    Median of an array in memory in O(n) with np.partition instead of a
+    full sort.
+    """
+    values = np.asarray(values, dtype=np.float64).ravel()
+    n = len(values)
+    if n == 0 or np.isnan(values).any():
+        return np.nan
+    half = n // 2
+    if n % 2:
+        return float(np.partition(values, half)[half])
+    lower, upper = np.partition(values, [half - 1, half])[half - 1:half + 1]
+    return (lower + upper) / 2
+
+
+def _is_array(data):
+    """
+    Data in memory: arrays, memory maps, pandas objects and sequences like
+    lists and tuples. Everything else (sets, dict views, iterators and
+    generators) is consumed as a stream.
+    """
+    return hasattr(data, '__array__') or isinstance(data, Sequence)
+
+
+def _blocks(data, size=100000):
+    """
+    Groups an iterable of single values or blocks of values into arrays, so
+    that single values are not processed one by one.
+    """
+    buffer = []
+    for item in data:
+        if np.ndim(item) == 0:
+            buffer.append(item)
+            if len(buffer) == size:
+                yield np.array(buffer, dtype=np.float64)
+                buffer = []
+        else:
+            if buffer:
+                yield np.array(buffer, dtype=np.float64)
+                buffer = []
+            yield item
+    if buffer:
+        yield np.array(buffer, dtype=np.float64)
+
+
+def mean(data):
+    """
+    Mean of an array (computed by NumPy without copying) or of an iterable of
+    values or blocks of values (consumed in one pass).
+    """
+    if _is_array(data):
+        return float(np.mean(data)) if len(data) else np.nan
+    result = StreamingMean()
+    for block in _blocks(data):
+        result.update(block)
+    return result.mean
+
+
+def median(data, approximate=None):
+    """
+    Median of an array (exact, with np.partition) or of an iterable of values
+    or blocks of values (approximate, with a t-digest in one pass).
+
+    approximate=True also uses the t-digest for an array, e.g. a memory map larger
+    than the memory, which is then read in blocks.
+    """
+    if approximate is None:
+        approximate = not _is_array(data)
+    if not approximate:
+        return exact_median(data)
+
+    estimate = TDigest()
+    blocks = _blocks(data)
+    if _is_array(data):
+        values = np.asarray(data).ravel()
+        blocks = (values[i:i + 1000000] for i in range(0, len(values), 1000000))
+    for block in blocks:
+        estimate.update(block)
+    return estimate.quantile(0.5)
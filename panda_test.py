@@ -9,43 +9,76 @@ import pandas as pd
 import numpy as np
 from matplotlib import pyplot as plt
 
-df = pd.read_csv('/local/home/biostudent216/Desktop/data/my_yeast_genome.tsv',sep="\t",header=None)
+import genome_cache
+import genome_stats
+import plot_large
 
-df.columns = ['Art','id','systematic','standard','function','sequence',
-              'gen length','seq mRNA', 'mRNA length']
+path = '/local/home/biostudent216/Desktop/data/my_yeast_genome.tsv'
 
-print(df.head())
+# streaming reads the table in chunks and only computes the statistics,
+# for genome tables that do not fit into the memory
+streaming = False
 
+# use_cache loads the table from a columnar binary cache next to the file,
+# which is built on the first run and rebuilt when the file changes
+use_cache = False
 
-mean = np.mean(df['mRNA length'])
+# 'Anzahl A' and 'Fehlende Sequenzen' count the upper case bases A, C, G and
+# T only, like the original character loop; with ignore_case = True soft
+# masked (lower case) bases and U are counted as well
+ignore_case = False
 
-print ("Mittlere Länge der mRNA Seq = {}".format(mean))
+if streaming:
+    stats = genome_stats.streaming_stats(path, ignore_case=ignore_case)
 
-A = 0
+    print("Mittlere Länge der mRNA Seq = {}".format(stats['mean mRNA length']))
+    print('Anzahl A = {}'.format(stats['base counts']['A']))
+    print('Fehlende Sequenzen = {}'.format(stats['missing sequences']))
 
-for index in df['sequence']:
-    
-    for j in index:
-        
-        if j == 'A':
-            A += 1
-    
-print('Anzahl A = {}'.format(A))
+elif use_cache:
+    table = genome_cache.load_genome(path)
 
+    # only the printed rows are decoded, the statistics below are computed
+    # on the memory mapped columns
+    print(table.to_dataframe(rows=5))
 
-leer = 0
+    mrna_length = table['mRNA length']
 
-for index in df['sequence']:
-    if 'T' not in index and 'A' not in index and 'C' not in index and 'G' not in index:
-        leer += 1
-        
-print('Fehlende Sequenzen = {}'.format(leer))
+    composition = genome_stats.buffer_composition(table['sequence'].buffer,
+                                                  table['sequence'].offsets,
+                                                  ignore_case=ignore_case)
 
-plt.plot(df['mRNA length'])
+else:
+    df = pd.read_csv(path,sep="\t",header=None)
 
+    df.columns = ['Art','id','systematic','standard','function','sequence',
+                  'gen length','seq mRNA', 'mRNA length']
 
+    print(df.head())
 
+    mrna_length = df['mRNA length']
 
+    composition = genome_stats.base_composition(df['sequence'],
+                                                ignore_case=ignore_case)
 
-            
+if not streaming:
 
+    # missing lengths are skipped, like pandas does
+    mean = np.nanmean(mrna_length)
+
+    print ("Mittlere Länge der mRNA Seq = {}".format(mean))
+
+    A = composition['A'].sum()
+
+    print('Anzahl A = {}'.format(A))
+
+
+    # sequences without any A, C, G or T
+    leer = composition['GC content'].isna().sum()
+
+    print('Fehlende Sequenzen = {}'.format(leer))
+
+    # reduced to the minimum and maximum per pixel, fast for millions of genes
+    plot_large.plot_decimated(mrna_length)
+
+    plt.show()
@@ -1,5 +1,6 @@
 import numpy as np 
 import matplotlib.pyplot as plt
+import matplotlib.animation as animation
 import operator
 
 
@@ -11,30 +12,70 @@ terms of the fourier series and the approximation obtained by the fourier series
 work on the TODOS."""
 
 
-def simulation(axis,array):
-    
+def simulation(axis, array, interval=50, save_file=None, fps=15):
+    """
+    :param axis:
+        array like. x values of the plot
+    :param array:
+        2 dimensional array, one partial sum per row. Row l is shown in frame l
+    :param interval:
+        Delay between frames in ms
+    :param save_file:
+        if given (e.g. 'fourier.mp4' or 'fourier.gif') the animation is rendered headlessly
+        with the Agg backend and saved to this file instead of being shown
+    :param fps:
+        Frames per second of the saved file
+    :return:
+        the animation object
+    """
+    if save_file is not None:
+        plt.switch_backend('Agg')
+
     fig = plt.figure(1, figsize=(12, 12))
-    
+
     ax = plt.subplot()
     ax.set_xlabel("Phase")
     ax.set_ylabel("Amplitude")
 
-    plt.show(block=False) 
-    
-    #plt.plot(x_axis,rechteck[3])
-    #fig.canvas.draw()
-    
-    #for _ in range(4):    
-    for l in range(len(array)):
-            
-            ax.clear()  # clear the drawing/plotting area
-            ax.set_title('Plot {}'.format(l))
-            ax.plot(axis,array[l])
-            fig.canvas.draw()
-            
-        
-        
-        
+    # axes, labels and limits are drawn once, every frame only updates the y data of the same line
+    ax.set_xlim(np.min(axis), np.max(axis))
+    margin = 0.05 * (np.max(array) - np.min(array))
+    ax.set_ylim(np.min(array) - margin, np.max(array) + margin)
+
+    line, = ax.plot(axis, array[0])
+    # inside the axes, so that it is part of the blitted area
+    title = ax.text(0.02, 0.95, '', transform=ax.transAxes)
+
+    def update(l):
+        line.set_ydata(array[l])
+        title.set_text('Plot {}'.format(l))
+        return line, title
+
+    ani = animation.FuncAnimation(fig, update, frames=len(array), interval=interval, blit=True)
+
+    if save_file is not None:
+        writer = 'pillow' if save_file.endswith('.gif') else 'ffmpeg'
+        ani.save(save_file, writer=writer, fps=fps)
+    else:
+        plt.show()
+    return ani
+
+
+def rechteck_puls(x, amp=1):
+    """
+    :param x:
+        array like. x values of the rectangular pulse
+    :param amp:
+        Amplitude of rectangular pulse
+    :return:
+        amp if x is between -2 pi and -pi or between 0 and pi, -amp otherwise (period 2 pi). As in the
+        original loop over [-2 pi, 2 pi] the intervals include their left end, only x = 2 pi still belongs
+        to the last interval and gives -amp.
+    """
+    x = np.asarray(x)
+    phase = np.mod(x, 2 * np.pi)
+    return np.where((phase < np.pi) & (x != 2 * np.pi), amp, -amp)
+
 
 def fourier_rechteck_puls(x, amp=1, depth=5):
     """
@@ -53,6 +94,42 @@ def fourier_rechteck_puls(x, amp=1, depth=5):
         f_g.append(f.tolist())  # i-th term is added to list
     return f_g
 
+
+def fourier_rechteck_partial_sums(x, amp=1, depth=5, dtype=np.float64, out=None, block_size=2**22):
+    """
+    :param x:
+        array like. Used as x values to calculate values of fourier series
+    :param amp:
+        Amplitude of rectangular pulse
+    :param depth:
+        Number of terms of series calculated
+    :param dtype:
+        dtype of the result, np.float32 halves the memory
+    :param out:
+        optional preallocated (depth, len(x)) array (e.g. np.memmap) the result is written to
+    :param block_size:
+        approximate number of elements computed at once, bounds the temporary memory
+    :return:
+        2 dimensional array of shape (depth, len(x)), row i is the sum of the first i + 1 terms
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if out is None:
+        out = np.empty((depth, len(x)), dtype=dtype)
+
+    rows = max(1, block_size // max(1, len(x)))
+    carry = np.zeros(len(x))
+    for start in range(0, depth, rows):
+        stop = min(start + rows, depth)
+        # odd harmonics 2i - 1, the phase is computed in double precision even for float32 output
+        k = np.arange(2 * start + 1, 2 * stop, 2, dtype=np.float64)[:, np.newaxis]
+        terms = np.sin(k * x) / k
+        terms *= 4 * amp / np.pi
+        np.cumsum(terms, axis=0, out=terms)
+        terms += carry
+        out[start:stop] = terms
+        carry = terms[-1]
+    return out
+
     
 if __name__ == '__main__':
     # TODO: define x axis from - 2 pi to 2 pi-. HINT: check out numpy arange or numpy linspace
@@ -61,13 +138,7 @@ if __name__ == '__main__':
     fig = plt.figure()  # reference to figure object
     ax = fig.add_subplot(111)  # reference to axis object (this is where you actually plot something)
     
-    arr=np.ones(len(x_axis))
-    
-    for i in range(len(x_axis)):
-        if x_axis[i] < (-1 * np.pi) or (x_axis[i] >= 0 and x_axis[i] < np.pi):
-            arr[i] = 1
-        else:
-            arr[i] = -1
+    arr = rechteck_puls(x_axis)
             
     #plt.plot(x_axis,arr)
     
@@ -78,19 +149,8 @@ if __name__ == '__main__':
 
     depths=100
 
-    fourier_sol = fourier_rechteck_puls(x_axis,depth=depths)
-    
-    rechteck=np.zeros((depths,len(x_axis)))    
-    
-    for j in range(depths):
-        
-        for k in range(len(fourier_sol)):
-            
-            if j == 0:
-                rechteck[j,k] = fourier_sol[j][k]
-            else:
-                rechteck[j,k] = rechteck[j-1,k] + fourier_sol[j][k]
-                
+    rechteck = fourier_rechteck_partial_sums(x_axis, depth=depths)
+
     simulation(x_axis,rechteck)
     #for l in range(len(rechteck)):
         
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+
+"""
+Plotting helpers for series with millions of points, e.g. the mRNA lengths of all genes in panda_test.py.
+A line plot can not show more points than the axis has pixels, so the series is reduced to the minimum and the
+maximum of every pixel bucket before it is handed to matplotlib. The plot looks the same (all peaks are kept),
+but only a few thousand points have to be drawn."""
+
+
+def minmax_decimate(y, n_buckets, x=None):
+    """
+    :param y:
+        array like. Values of the series, NaN values are allowed
+    :param n_buckets:
+        Number of buckets, usually the width of the axis in pixels
+    :param x:
+        array like. x values of the series, default is the index 0 ... len(y) - 1
+    :return:
+        x and y values of the minimum and the maximum of every bucket, in the order they occur in the series
+    """
+    y = np.asarray(y, dtype=np.float64)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    if len(y) <= 2 * n_buckets:
+        return x, y
+
+    size = -(-len(y) // n_buckets)  # ceil division
+    n_buckets = -(-len(y) // size)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:len(y)] = y
+    padded = padded.reshape(n_buckets, size)
+
+    # NaN values (and the padding) never win, a bucket of NaNs gives a NaN and therefore a gap in the line
+    start = np.arange(n_buckets) * size
+    i_min = start + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    i_max = start + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+
+    indices = np.sort(np.stack([i_min, i_max], axis=1), axis=1).ravel()
+    indices = np.minimum(indices, len(y) - 1)
+    return x[indices], y[indices]
+
+
+def plot_decimated(y, ax=None, x=None, n_buckets=None, **kwargs):
+    """
+    :param y:
+        array like. Values of the series
+    :param ax:
+        axis to plot in, default is the current axis
+    :param x:
+        array like. x values of the series, default is the index
+    :param n_buckets:
+        Number of buckets, default is the width of the axis in pixels
+    :param kwargs:
+        passed on to ax.plot
+    :return:
+        list of the plotted lines
+    """
+    ax = ax or plt.gca()
+    if n_buckets is None:
+        n_buckets = max(1, int(ax.get_window_extent().width))
+    # the index of a Series is its x axis (lists also have an index method)
+    if x is None and isinstance(y, pd.Series):
+        x = np.asarray(y.index)
+    x_plot, y_plot = minmax_decimate(y, n_buckets, x)
+    return ax.plot(x_plot, y_plot, **kwargs)
+
+
+def plot_histogram(y, bins=100, ax=None, **kwargs):
+    """
+    :param y:
+        array like. Values, NaN values are ignored
+    :param bins:
+        Number of bins or bin edges, see np.histogram
+    :param ax:
+        axis to plot in, default is the current axis
+    :param kwargs:
+        passed on to ax.hist
+    :return:
+        counts and bin edges
+    """
+    ax = ax or plt.gca()
+    y = np.asarray(y, dtype=np.float64)
+    counts, edges = np.histogram(y[np.isfinite(y)], bins=bins)
+    # only one value per bin is passed to matplotlib, weighted with the precomputed count
+    ax.hist(edges[:-1], edges, weights=counts, **kwargs)
+    return counts, edges
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Quiz engine of the Biophysik quiz, independent of the Tk user interface
+
+A QuestionBank holds the questions read only and is shared by any number of
+QuizSession objects, which only store the state of one player. The
+SessionManager keeps many sessions in one process for asyncio servers.
+"""
+
+import asyncio
+import itertools
+import time
+from random import randint, sample
+
+import quiz_store
+
+
+class QuestionBank:
+    """
+    Read only questions, every question is a tuple (question, right answer,
+    wrong answer 1, 2, 3).
+    """
+
+    def __init__(self, questions):
+        self.questions = tuple(questions)
+
+    @classmethod
+    def from_file(cls, filename="./Fragen.txt"):
+        return cls(quiz_store.load_questions(filename))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __getitem__(self, number):
+        return self.questions[number]
+
+
+class QuizSession:
+    """
+    State of one quiz: the questions not asked yet, the current question and
+    the points.
+
+    The questions are drawn in random order without repetition by a lazy
+    Fisher-Yates shuffle. Only the swapped positions are stored, so a session
+    needs memory for the questions asked, not for the whole bank.
+    """
+
+    __slots__ = ('bank', 'swapped', 'next_position', 'current',
+                 'scored', 'points')
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.restart()
+
+    def restart(self):
+        """
+        Makes all questions available again and resets the points.
+        """
+        self.swapped = {}
+        self.next_position = 0
+        self.current = None
+        self.scored = False
+        self.points = 0
+
+    @property
+    def max_points(self):
+        return len(self.bank)
+
+    @property
+    def remaining(self):
+        return len(self.bank) - self.next_position
+
+    def draw(self):
+        """
+        Draws the next question. Returns the question number, the question
+        and its four answers in random order, or None if every question was
+        asked.
+        """
+        if self.next_position >= len(self.bank):
+            self.current = None
+            return None
+
+        # swap a random one of the remaining positions to the front
+        position = self.next_position
+        pick = randint(position, len(self.bank) - 1)
+        number = self.swapped.get(pick, pick)
+        self.swapped[pick] = self.swapped.pop(position, position)
+        self.next_position += 1
+
+        self.current = number
+        self.scored = False
+        question = self.bank[number]
+        return number, question[0], tuple(sample(question[1:], 4))
+
+    @property
+    def right_answer(self):
+        if self.current is None:
+            return None
+        return self.bank[self.current][1]
+
+    def answer(self, text):
+        """
+        Checks an answer to the current question. The first right answer to a
+        question scores a point. Returns whether the answer is right.
+        """
+        if self.current is None:
+            return False
+        right = text == self.bank[self.current][1]
+        if right and not self.scored:
+            self.scored = True
+            self.points += 1
+        return right
+
+
+class SessionManager:
+    """
+    Many quiz sessions over one shared question bank for an asyncio server.
+
+    The operations do not block, sessions idle for longer than max_idle
+    seconds are removed by expire().
+    """
+
+    def __init__(self, bank, max_idle=3600):
+        self.bank = bank
+        self.max_idle = max_idle
+        self.sessions = {}
+        self.last_used = {}
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def _get(self, session_id):
+        self.last_used[session_id] = time.monotonic()
+        return self.sessions[session_id]
+
+    async def create(self):
+        session_id = next(self._ids)
+        self.sessions[session_id] = QuizSession(self.bank)
+        self.last_used[session_id] = time.monotonic()
+        return session_id
+
+    async def draw(self, session_id):
+        return self._get(session_id).draw()
+
+    async def answer(self, session_id, text):
+        return self._get(session_id).answer(text)
+
+    async def points(self, session_id):
+        session = self._get(session_id)
+        return session.points, session.max_points
+
+    async def close(self, session_id):
+        self.sessions.pop(session_id, None)
+        self.last_used.pop(session_id, None)
+
+    async def expire(self):
+        """
+        Removes the idle sessions, returns how many were removed.
+        """
+        limit = time.monotonic() - self.max_idle
+        idle = [session_id for session_id, used in self.last_used.items()
+                if used < limit]
+        for session_id in idle:
+            await self.close(session_id)
+        return len(idle)
+
+    async def run_expiry(self, interval=60):
+        """
+        Task removing idle sessions every interval seconds.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await self.expire()
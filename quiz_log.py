@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Answer log of the Biophysik quiz
+
+Every click on an answer is one fixed size binary record (RECORD). The
+records are collected in a NumPy buffer and appended to the log file in
+blocks, so a quiz server with many sessions writes rarely and never
+rewrites the file. read_log() maps the whole file without parsing and
+difficulty() aggregates it per question.
+"""
+
+import os
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from quiz_scheduler import question_key
+
+RECORD = np.dtype([('question', '<u8'),    # quiz_scheduler.question_key
+                   ('session', '<u4'),
+                   ('answer', 'i1'),       # 1 is the right answer, 2 ... 4 the wrong ones
+                   ('attempt', 'u1'),      # 0 for the first click on a question
+                   ('correct', '?'),
+                   ('latency', '<f4'),     # seconds since the question was shown
+                   ('timestamp', '<f8')])  # seconds since the epoch
+
+
+class AnswerLog:
+    """
+    Append only log, flushed every buffer_size records and on close().
+    """
+
+    def __init__(self, filename="./Fragen.txt.answers.bin", buffer_size=1024):
+        self.filename = filename
+        self.buffer = np.zeros(buffer_size, dtype=RECORD)
+        self.filled = 0
+
+    def new_session(self):
+        return random.getrandbits(32)
+
+    def record(self, session, question, answer, attempt, correct, latency,
+               timestamp=None):
+        """
+        Adds one answer, question is the question tuple of the QuestionBank
+        and answer the text of the chosen answer.
+        """
+        row = self.buffer[self.filled]
+        row['question'] = question_key(question)
+        row['session'] = session
+        row['answer'] = question.index(answer) if answer in question[1:] else -1
+        row['attempt'] = min(attempt, 255)
+        row['correct'] = correct
+        row['latency'] = latency
+        row['timestamp'] = time.time() if timestamp is None else timestamp
+        self.filled += 1
+        if self.filled == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.filled == 0:
+            return
+        with open(self.filename, 'ab') as f:
+            self.buffer[:self.filled].tofile(f)
+        self.filled = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log(filename="./Fragen.txt.answers.bin"):
+    """
+    Returns the log as DataFrame. The file is memory mapped, a record only
+    partly written (e.g. after a crash) is ignored.
+    """
+    if not os.path.exists(filename) or os.path.getsize(filename) < RECORD.itemsize:
+        return pd.DataFrame(np.zeros(0, dtype=RECORD))
+    n = os.path.getsize(filename) // RECORD.itemsize
+    return pd.DataFrame(np.memmap(filename, dtype=RECORD, mode='r', shape=(n,)))
+
+
+def difficulty(log, bank=None):
+    """
+    Difficulty of every question in the log: the number of times it was
+    asked (first clicks), the share of wrong first answers, the mean number
+    of clicks until the right answer, the median latency of the first click
+    and the number of sessions. With a QuestionBank the question texts are
+    added. Sorted from the most difficult question.
+    """
+    first = log[log['attempt'] == 0]
+    grouped = first.groupby('question')
+    result = pd.DataFrame({'asked': grouped.size(),
+                           'error rate': 1 - grouped['correct'].mean(),
+                           'median latency': grouped['latency'].median(),
+                           'sessions': grouped['session'].nunique()})
+
+    # clicks until the right answer, per question and session
+    right = log[log['correct']]
+    clicks = right.groupby(['question', 'session'])['attempt'].min() + 1
+    result['clicks'] = clicks.groupby(level='question').mean()
+
+    if bank is not None:
+        texts = pd.Series([question[0] for question in bank.questions],
+                          index=[question_key(question) for question in bank.questions])
+        texts = texts[~texts.index.duplicated()]
+        result['question text'] = texts.reindex(result.index).values
+    return result.sort_values(['error rate', 'clicks'], ascending=False)
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Spaced repetition for the Biophysik quiz
+
+The Scheduler keeps for every question of a QuestionBank its SM-2 state
+(ease factor, interval, number of correct repetitions in a row) and the time
+it is due again. The questions wait in a heap keyed by due time and ease
+factor, so the next question (the one due first, and of those the most
+difficult one) is found in O(log n).
+
+The learner state is saved as .npz file with one small array per field; the
+questions are identified by a 64 bit hash of their text, so the state stays
+valid when questions are added to or removed from the question file.
+"""
+
+import hashlib
+import heapq
+import os
+import random
+import time
+
+import numpy as np
+
+DAY = 24 * 60 * 60
+
+# a wrongly answered question comes again after this many seconds
+RELEARN_DELAY = 60
+
+MIN_EASE = 1.3
+START_EASE = 2.5
+
+
+def question_key(question):
+    """
+    64 bit hash of the question text, stable between runs.
+    """
+    digest = hashlib.blake2b(question[0].encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class Scheduler:
+    """
+    SM-2 scheduling of the questions of a QuestionBank.
+    """
+
+    def __init__(self, bank, filename=None):
+        self.bank = bank
+        self.filename = filename
+        n = len(bank)
+        self.keys = np.array([question_key(question) for question in bank.questions],
+                             dtype=np.uint64)
+        self.ease = np.full(n, START_EASE, dtype=np.float32)
+        self.interval = np.zeros(n, dtype=np.float32)   # days
+        self.repetitions = np.zeros(n, dtype=np.uint16)
+        self.due = np.zeros(n, dtype=np.float64)        # seconds since the epoch
+        if filename is not None and os.path.exists(filename):
+            self.load(filename)
+        self._build_heap()
+
+    def _entry(self, number):
+        # the random number mixes questions with the same due time and ease
+        return (self.due[number], self.ease[number], random.random(), number)
+
+    def _build_heap(self):
+        self.heap = [self._entry(number) for number in range(len(self.bank))]
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def due_count(self, now=None):
+        now = time.time() if now is None else now
+        return int(np.count_nonzero(self.due <= now))
+
+    def next_question(self, now=None):
+        """
+        Removes the question due first from the heap and returns its number,
+        or None if no question is due at time now. The question has to be
+        given back with review() or postpone().
+        """
+        now = time.time() if now is None else now
+        if not self.heap or self.heap[0][0] > now:
+            return None
+        return heapq.heappop(self.heap)[3]
+
+    def postpone(self, number):
+        """
+        Puts a question back into the heap without a review.
+        """
+        heapq.heappush(self.heap, self._entry(number))
+
+    def review(self, number, quality, now=None):
+        """
+        Updates the SM-2 state of a question with the quality of the answer
+        (0 ... 5, at least 3 is correct) and puts it back into the heap.
+        """
+        now = time.time() if now is None else now
+        if quality >= 3:
+            if self.repetitions[number] == 0:
+                self.interval[number] = 1
+            elif self.repetitions[number] == 1:
+                self.interval[number] = 6
+            else:
+                self.interval[number] *= self.ease[number]
+            self.repetitions[number] += 1
+            self.due[number] = now + self.interval[number] * DAY
+        else:
+            self.repetitions[number] = 0
+            self.interval[number] = 0
+            self.due[number] = now + RELEARN_DELAY
+        wrong = 5 - quality
+        self.ease[number] = max(MIN_EASE, self.ease[number] + 0.1 - wrong * (0.08 + wrong * 0.02))
+        heapq.heappush(self.heap, self._entry(number))
+
+    def save(self, filename=None):
+        filename = filename or self.filename
+        # write to a temporary file first, an interrupted save keeps the old state
+        temporary = filename + '.tmp.npz'
+        np.savez(temporary, keys=self.keys, ease=self.ease, interval=self.interval,
+                 repetitions=self.repetitions, due=self.due)
+        os.replace(temporary, filename)
+
+    def load(self, filename):
+        """
+        Takes over the saved state of all questions still in the bank.
+        """
+        with np.load(filename) as saved:
+            keys = saved['keys']
+            if len(keys) == 0:
+                return
+            order = np.argsort(keys)
+            position = np.searchsorted(keys, self.keys, sorter=order)
+            position = order[np.minimum(position, len(keys) - 1)]
+            found = keys[position] == self.keys
+            for field in ('ease', 'interval', 'repetitions', 'due'):
+                getattr(self, field)[found] = saved[field][position[found]]
+
+
+class ReviewSession:
+    """
+    Quiz session asking the due questions of a Scheduler, with the same
+    interface as quiz_engine.QuizSession.
+    """
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.bank = scheduler.bank
+        self.restart()
+
+    def restart(self):
+        self.current = None
+        self.scored = False
+        self.answered = False
+        self.points = 0
+        self.asked = 0
+
+    @property
+    def max_points(self):
+        return self.asked
+
+    @property
+    def remaining(self):
+        return self.scheduler.due_count()
+
+    def draw(self, now=None):
+        # a question skipped without an answer stays due
+        if self.current is not None and not self.answered:
+            self.scheduler.postpone(self.current)
+        number = self.scheduler.next_question(now)
+        self.current = number
+        if number is None:
+            return None
+        self.scored = False
+        self.answered = False
+        self.asked += 1
+        question = self.bank[number]
+        return number, question[0], tuple(random.sample(question[1:], 4))
+
+    @property
+    def right_answer(self):
+        if self.current is None:
+            return None
+        return self.bank[self.current][1]
+
+    def answer(self, text, now=None):
+        """
+        Checks an answer to the current question. Only the first answer to a
+        question is reviewed: right is quality 4, wrong is quality 1.
+        """
+        if self.current is None:
+            return False
+        right = text == self.bank[self.current][1]
+        if not self.answered:
+            self.answered = True
+            self.scheduler.review(self.current, 4 if right else 1, now)
+            if right:
+                self.scored = True
+                self.points += 1
+        return right
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Question store for the Biophysik quiz (BioPhQuiz3.py)
+
+A question is one line of Fragen.txt: the question, the right answer and the
+three wrong answers, separated by commas. Fields containing commas can be
+quoted ("..."), a line ending with $ is continued on the next line. Lines
+starting with # or consisting of dashes are comments.
+
+The parsed questions are cached next to the question file and loaded from
+there as long as the question file is not modified. The cache is an .npz
+file of plain arrays, all fields as one UTF-8 buffer plus their offsets,
+and is loaded without pickle, so it can not contain code.
+"""
+
+import csv
+import os
+import zipfile
+
+import numpy as np
+
+CACHE_VERSION = 2
+
+# fields of a question
+FIELDS = 5
+
+# Fragen.txt is written in Latin-1
+ENCODING = 'latin-1'
+
+
+def _is_comment(line):
+    stripped = line.strip()
+    return not stripped or stripped.startswith('#') or set(stripped) == {'-'}
+
+
+def parse_questions(lines):
+    """
+    Parses the lines of a question file into a tuple of questions, every
+    question is a tuple (question, right answer, wrong answer 1, 2, 3).
+    """
+    records = []
+    logical = []
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        if not logical and _is_comment(line):
+            continue
+        if line.rstrip().endswith('$'):
+            logical.append(line.rstrip()[:-1].strip())
+            continue
+        logical.append(line.strip())
+        records.append((number, ' '.join(logical)))
+        logical = []
+    if logical:
+        records.append((number, ' '.join(logical)))
+
+    questions = []
+    reader = csv.reader((record for _, record in records), skipinitialspace=True)
+    for (number, _), fields in zip(records, reader):
+        fields = [field.strip() for field in fields]
+        if len(fields) != FIELDS:
+            raise ValueError('Line {}: a question needs the question, the right '
+                             'answer and 3 wrong answers, got {} fields'.format(number, len(fields)))
+        questions.append(tuple(fields))
+    return tuple(questions)
+
+
+def _file_key(filename):
+    stat = os.stat(filename)
+    return np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def _write_cache(cache_file, key, questions):
+    fields = [field for question in questions for field in question]
+    lengths = [len(field) for field in fields]
+    # offsets in characters of the decoded text
+    offsets = np.zeros(len(fields) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    text = np.frombuffer(''.join(fields).encode('utf-8'), dtype=np.uint8)
+    with open(cache_file, 'wb') as f:
+        np.savez(f, key=key, offsets=offsets, text=text)
+
+
+def _read_cache(cache_file, key):
+    """
+    The questions of the cache, None if it belongs to another version of
+    the question file.
+    """
+    with np.load(cache_file, allow_pickle=False) as data:
+        if not np.array_equal(data['key'], key):
+            return None
+        offsets = data['offsets'].tolist()
+        text = data['text'].tobytes().decode('utf-8')
+    if not offsets or offsets[-1] != len(text) or (len(offsets) - 1) % FIELDS:
+        raise ValueError('Damaged question cache')
+    fields = [text[start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+    # groups of FIELDS consecutive fields
+    return tuple(zip(*[iter(fields)] * FIELDS))
+
+
+def load_questions(filename="./Fragen.txt", use_cache=True):
+    """
+    Returns the questions of filename, from the cache filename + '.cache' if
+    it belongs to the current version of the file.
+    """
+    cache_file = filename + '.cache'
+    key = _file_key(filename)
+
+    if use_cache and os.path.exists(cache_file):
+        try:
+            questions = _read_cache(cache_file, key)
+            if questions is not None:
+                return questions
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            # e.g. a damaged cache or one of an older version, rebuilt below
+            pass
+
+    with open(filename, encoding=ENCODING) as f:
+        questions = parse_questions(f)
+
+    if use_cache:
+        try:
+            _write_cache(cache_file, key, questions)
+        except OSError:
+            # the questions can be used without a cache
+            pass
+    return questions
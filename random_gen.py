@@ -2,23 +2,110 @@
 """
 Spyder Editor
 
-This is a temporary script file.
+Generator of random test data.
+
+The rows are drawn as NumPy arrays, one vectorised draw per block of rows,
+and written to disk block by block, so that also 10^8 values can be
+generated in bounded memory. Besides comma separated text the data can be
+written as .npy file with a JSON header, which is memory mapped by load()
+instead of being parsed again.
 """
 
+import json
+
 import numpy as np
-from matplotlib import pyplot as plt
-
-second = []
-for i in range(1,11):
-    first = ""
-    for _ in range(50):
-        first += str(round(np.random.uniform(i,5*i)+np.random.uniform(-i,i),2)) + "," 
-    first = first[:-1]
-    first += '\n'
-    second.append(first)
-    
-    
-with open("./janosch_mathe","w") as janosch:    
-    janosch.writelines(second)
-    
 
+
+def draw_block(rng, first_row, n_rows, columns, distribution='janosch',
+               **params):
+    """
+    Draws the rows first_row ... first_row + n_rows - 1 as one array.
+
+    distribution 'janosch' is the original test data: row i (counting from 1)
+    contains uniform(i, 5 i) + uniform(-i, i) values. 'uniform' takes the
+    parameters low and high, 'normal' loc and scale.
+    """
+    size = (n_rows, columns)
+    if distribution == 'janosch':
+        i = np.arange(first_row + 1, first_row + n_rows + 1)[:, np.newaxis]
+        return rng.uniform(i, 5 * i, size) + rng.uniform(-i, i, size)
+    if distribution == 'uniform':
+        return rng.uniform(params.get('low', 0.0), params.get('high', 1.0), size)
+    if distribution == 'normal':
+        return rng.normal(params.get('loc', 0.0), params.get('scale', 1.0), size)
+    raise ValueError("Unknown distribution '{}'".format(distribution))
+
+
+def generate(rows=10, columns=50, distribution='janosch', seed=None,
+             block_rows=100000, **params):
+    """
+    Yields the data in blocks of at most block_rows rows.
+
+    With the same seed and block_rows the same data is generated.
+    """
+    rng = np.random.default_rng(seed)
+    for first_row in range(0, rows, block_rows):
+        n_rows = min(block_rows, rows - first_row)
+        yield draw_block(rng, first_row, n_rows, columns, distribution,
+                         **params)
+
+
+def write_csv(filename="./janosch_mathe", rows=10, columns=50,
+              distribution='janosch', seed=None, decimals=2,
+              block_rows=100000, **params):
+    """
+    Writes the generated data as comma separated text, block by block.
+    """
+    with open(filename, "w") as janosch:
+        for block in generate(rows, columns, distribution, seed, block_rows,
+                              **params):
+            np.savetxt(janosch, block, fmt='%.{}f'.format(decimals),
+                       delimiter=',')
+
+
+def write_npy(filename="./janosch_mathe.npy", rows=10, columns=50,
+              distribution='janosch', seed=None, dtype=np.float64,
+              block_rows=100000, **params):
+    """
+    Writes the generated data as .npy file, block by block into a memory
+    map, and the generation parameters to filename + '.json'.
+
+    Without a seed a random one is chosen and recorded in the header, so
+    that the data can always be generated again.
+    """
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy)
+
+    data = np.lib.format.open_memmap(filename, mode='w+', dtype=dtype,
+                                     shape=(rows, columns))
+    first_row = 0
+    for block in generate(rows, columns, distribution, seed, block_rows,
+                          **params):
+        data[first_row:first_row + len(block)] = block
+        first_row += len(block)
+    data.flush()
+    del data
+
+    header = {'shape': [rows, columns],
+              'dtype': np.dtype(dtype).name,
+              'seed': seed,
+              'distribution': distribution,
+              'block_rows': block_rows,
+              'params': params}
+    with open(filename + '.json', 'w') as f:
+        json.dump(header, f, indent=2)
+    return header
+
+
+def load(filename="./janosch_mathe.npy"):
+    """
+    Returns the data written by write_npy() as read only memory map (no copy
+    into memory) and the JSON header.
+    """
+    with open(filename + '.json') as f:
+        header = json.load(f)
+    return np.load(filename, mmap_mode='r'), header
+
+
+if __name__ == '__main__':
+    write_csv("./janosch_mathe")
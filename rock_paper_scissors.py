@@ -1,35 +1,58 @@
+import numpy as np
 import numpy.random as random
 
-def rock_paper_scissors():
+import rps_engine
+
+# play against an opponent learning from your moves instead of a random one
+ai_opponent = False
+
+
+def rock_paper_scissors(ai=None):
     """
     Implementation of the game Rock, Paper, Scissors
+
+    ai is an rps_engine strategy reset for one game, e.g. an
+    rps_engine.NGramStrategy predicting your next move from your last ones.
+    Without ai the computer plays randomly.
     """
     scissors = {'rock': False, 'paper': True}
     rock = {'scissors': True, 'paper': False}
     paper = {'scissors': False, 'rock': True}
-    
+
     choices = {'scissors': scissors, 'rock': rock, 'paper': paper}
-    
-    answer = None
-    while answer not in choices:
-        answer = input("'rock', 'paper', or 'scissors'? ")
 
-    computer_answer = random.choice(['rock', 'paper', 'scissors'])
+    new_game = 'y'
+    while new_game in ['y', 'Y', 'yes', ]:
+        answer = None
+        while answer not in choices:
+            answer = input("'rock', 'paper', or 'scissors'? ")
 
-    if answer == computer_answer:
-        print('Computer has {} as well!'.format(computer_answer))
-        print('TIED GAME')
-    else:
-        if choices[answer][computer_answer]:
-            print('Computer has {}'.format(computer_answer))
-            print('YOU WON')
+        if ai is None:
+            computer_answer = random.choice(['rock', 'paper', 'scissors'])
         else:
-            print('Computer has {}'.format(computer_answer))
-            print('YOU LOST')
+            computer_code = ai.move()
+            computer_answer = rps_engine.decode(computer_code[0])
+            # the AI learns your move after its own move is fixed
+            ai.update(computer_code, np.array([rps_engine.encode(answer)]))
+
+        if answer == computer_answer:
+            print('Computer has {} as well!'.format(computer_answer))
+            print('TIED GAME')
+        else:
+            if choices[answer][computer_answer]:
+                print('Computer has {}'.format(computer_answer))
+                print('YOU WON')
+            else:
+                print('Computer has {}'.format(computer_answer))
+                print('YOU LOST')
+
+        new_game = input("Another round? (y/n) ")
 
-    new_game = input("Another round? (y/n) ")
-    if new_game in ['y', 'Y', 'yes', ]:
-        rock_paper_scissors()
 
 if __name__ == "__main__":
-    rock_paper_scissors()
\ No newline at end of file
+    if ai_opponent:
+        ai = rps_engine.NGramStrategy(order=3)
+        ai.reset(1, np.random.default_rng())
+        rock_paper_scissors(ai)
+    else:
+        rock_paper_scissors()
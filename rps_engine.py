@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+Self-play engine for rock, paper, scissors
+
+The moves are small integers (ROCK, PAPER, SCISSORS = 0, 1, 2), move m is
+beaten by (m + 1) % 3, and a round is decided by one lookup in the 3 x 3
+table PAYOFF. A match is played for many independent games at once: every
+round is one NumPy operation over all games, and the random numbers are
+drawn in blocks of rounds. Strategies without memory (random, constant,
+cycle) even produce all their moves of a match in one call, so their matches
+need no loop at all.
+"""
+
+import copy
+
+import numpy as np
+
+MOVES = ['rock', 'paper', 'scissors']
+ROCK, PAPER, SCISSORS = 0, 1, 2
+
+# PAYOFF[a, b] is 1 if move a beats move b, -1 if it loses and 0 for a tie
+PAYOFF = np.array([[0, -1, 1],
+                   [1, 0, -1],
+                   [-1, 1, 0]], dtype=np.int8)
+
+# number of rounds drawn at once by the random number generators
+BLOCK = 1024
+
+
+def encode(moves):
+    """
+    Move names to codes.
+    """
+    if isinstance(moves, str):
+        return MOVES.index(moves)
+    return np.array([MOVES.index(move) for move in moves], dtype=np.int8)
+
+
+def decode(codes):
+    """
+    Move codes to names.
+    """
+    if np.ndim(codes) == 0:
+        return MOVES[int(codes)]
+    return [MOVES[code] for code in np.asarray(codes).ravel()]
+
+
+def beat(moves):
+    """
+    The moves beating the given moves.
+    """
+    return (np.asarray(moves) + 1) % 3
+
+
+def tie_noise(rng, size):
+    """
+    Random numbers below 0.5 added to integer counts, so that argmax breaks
+    ties randomly without changing the order of different counts.
+    """
+    return rng.random(size) * 0.5
+
+
+class RandomBlocks:
+    """
+    Random numbers of a match, drawn BLOCK rounds at a time.
+    """
+
+    def __init__(self, rng, games, draw):
+        self.rng = rng
+        self.games = games
+        self.draw = draw
+        self.round = BLOCK
+
+    def next(self):
+        if self.round == BLOCK:
+            self.block = self.draw(self.rng, (BLOCK, self.games))
+            self.round = 0
+        self.round += 1
+        return self.block[self.round - 1]
+
+
+class Strategy:
+    """
+    Base class of the strategies.
+
+    reset() starts a match of `games` games, move() returns the moves of the
+    next round for all games and update() passes the moves of both players
+    after the round. Strategies without memory set `stateless` and return
+    the moves of all rounds at once from moves().
+
+    The version has to be increased whenever the behaviour changes, it is
+    part of the name under which results are cached.
+    """
+
+    version = 1
+    stateless = False
+
+    @property
+    def name(self):
+        return type(self).__name__
+
+    def reset(self, games, rng):
+        self.games = games
+        self.rng = rng
+
+    def move(self):
+        raise NotImplementedError
+
+    def update(self, own, other):
+        pass
+
+    def moves(self, rounds):
+        raise NotImplementedError
+
+
+class RandomStrategy(Strategy):
+    """
+    Random moves with the probabilities p (default uniform).
+    """
+
+    stateless = True
+
+    def __init__(self, p=None):
+        self.p = None if p is None else np.asarray(p, dtype=np.float64) / np.sum(p)
+
+    @property
+    def name(self):
+        if self.p is None:
+            return 'RandomStrategy'
+        return 'RandomStrategy({})'.format(','.join('{:g}'.format(p) for p in self.p))
+
+    def moves(self, rounds):
+        if self.p is None:
+            return self.rng.integers(0, 3, (rounds, self.games), dtype=np.int8)
+        return self.rng.choice(3, (rounds, self.games), p=self.p).astype(np.int8)
+
+
+class ConstantStrategy(Strategy):
+    """
+    Always the same move.
+    """
+
+    stateless = True
+
+    def __init__(self, move=ROCK):
+        self.code = encode(move) if isinstance(move, str) else move
+
+    @property
+    def name(self):
+        return 'ConstantStrategy({})'.format(MOVES[self.code])
+
+    def moves(self, rounds):
+        return np.full((rounds, self.games), self.code, dtype=np.int8)
+
+
+class CycleStrategy(Strategy):
+    """
+    Rock, paper, scissors, rock, ... starting at a random move in every game.
+    """
+
+    stateless = True
+
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.start = rng.integers(0, 3, games)
+        self.played = 0
+
+    def moves(self, rounds):
+        steps = self.played + np.arange(rounds)[:, np.newaxis]
+        self.played += rounds
+        return ((self.start + steps) % 3).astype(np.int8)
+
+
+class BeatLastStrategy(Strategy):
+    """
+    Plays the move beating the last move of the opponent.
+    """
+
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.next_move = rng.integers(0, 3, games, dtype=np.int8)
+
+    def move(self):
+        return self.next_move
+
+    def update(self, own, other):
+        self.next_move = beat(other).astype(np.int8)
+
+
+class FrequencyStrategy(Strategy):
+    """
+    Counts the moves of the opponent and plays the move beating the most
+    frequent one (ties are broken randomly).
+    """
+
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.counts = np.zeros((games, 3))
+        self.noise = RandomBlocks(rng, games * 3, tie_noise)
+
+    def move(self):
+        noise = self.noise.next().reshape(self.games, 3)
+        return beat(np.argmax(self.counts + noise, axis=1)).astype(np.int8)
+
+    def update(self, own, other):
+        self.counts[np.arange(self.games), other] += 1
+
+
+class MarkovStrategy(Strategy):
+    """
+    Counts which move of the opponent followed its previous move (a first
+    order Markov chain), predicts the next move from the last one and plays
+    the move beating the prediction.
+    """
+
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.counts = np.zeros((games, 3, 3))
+        self.last = rng.integers(0, 3, games)
+        self.noise = RandomBlocks(rng, games * 3, tie_noise)
+
+    def move(self):
+        noise = self.noise.next().reshape(self.games, 3)
+        row = self.counts[np.arange(self.games), self.last]
+        return beat(np.argmax(row + noise, axis=1)).astype(np.int8)
+
+    def update(self, own, other):
+        self.counts[np.arange(self.games), self.last, other] += 1
+        self.last = other
+
+
+class NGramStrategy(Strategy):
+    """
+    Predicts the next move of the opponent from its last 1 ... order moves
+    and plays the move beating the prediction.
+
+    For every context length k there is a table of counts with 3^k rows,
+    the row of the current context is an integer updated with
+    (context * 3 + move) % 3^k, so a round costs O(order) whatever the
+    length of the history, and the memory is bounded by the tables. The
+    longest context already seen decides. With decay < 1 older moves count
+    less: the increment grows by 1 / decay every round instead of scaling
+    all counts, the tables are only rescaled when the increment gets large.
+    """
+
+    def __init__(self, order=3, decay=1.0):
+        self.order = order
+        self.decay = decay
+
+    @property
+    def name(self):
+        if self.decay == 1:
+            return 'NGramStrategy({})'.format(self.order)
+        return 'NGramStrategy({},{:g})'.format(self.order, self.decay)
+
+    def reset(self, games, rng):
+        super().reset(games, rng)
+        self.counts = [np.zeros((games, 3 ** k, 3)) for k in range(1, self.order + 1)]
+        self.context = np.zeros((self.order, games), dtype=np.int64)
+        self.seen = 0
+        self.weight = 1.0
+        self.noise = RandomBlocks(rng, games * 3, tie_noise)
+
+    def move(self):
+        index = np.arange(self.games)
+        prediction = np.zeros((self.games, 3))
+        found = np.zeros(self.games, dtype=bool)
+        for k in range(min(self.order, self.seen), 0, -1):
+            row = self.counts[k - 1][index, self.context[k - 1]]
+            total = row.max(axis=1)
+            use = ~found & (total > 0)
+            prediction[use] = row[use] / total[use, np.newaxis]
+            found |= use
+        # scaled rows are at most 1, the noise only breaks ties among them,
+        # for games without any prediction it chooses a random move
+        noise = self.noise.next().reshape(self.games, 3)
+        noise[found] *= 1e-6
+        return beat(np.argmax(prediction + noise, axis=1)).astype(np.int8)
+
+    def update(self, own, other):
+        index = np.arange(self.games)
+        for k in range(1, self.order + 1):
+            if self.seen >= k:
+                self.counts[k - 1][index, self.context[k - 1], other] += self.weight
+            self.context[k - 1] = (self.context[k - 1] * 3 + other) % 3 ** k
+        self.seen += 1
+        if self.decay < 1:
+            self.weight /= self.decay
+            if self.weight > 1e100:
+                for counts in self.counts:
+                    counts /= self.weight
+                self.weight = 1.0
+
+
+def tally(results):
+    """
+    Wins, losses and ties of the first player per game from payoffs.
+    """
+    wins = np.count_nonzero(results == 1, axis=0)
+    losses = np.count_nonzero(results == -1, axis=0)
+    return wins, losses, results.shape[0] - wins - losses
+
+
+def play(strategy_a, strategy_b, rounds=1000, games=1, seed=None):
+    """
+    Plays `games` independent matches of `rounds` rounds between two
+    strategies. Returns a dict with the wins, losses and ties of strategy_a
+    per game.
+    """
+    if strategy_b is strategy_a:
+        # a strategy against itself needs two independent states
+        strategy_b = copy.deepcopy(strategy_a)
+    rng_a, rng_b = np.random.default_rng(seed).spawn(2)
+    strategy_a.reset(games, rng_a)
+    strategy_b.reset(games, rng_b)
+    wins = np.zeros(games, dtype=np.int64)
+    losses = np.zeros(games, dtype=np.int64)
+
+    if strategy_a.stateless and strategy_b.stateless:
+        # the whole match at once, in blocks to bound the memory
+        for start in range(0, rounds, BLOCK):
+            n = min(BLOCK, rounds - start)
+            block_wins, block_losses, _ = tally(
+                PAYOFF[strategy_a.moves(n), strategy_b.moves(n)])
+            wins += block_wins
+            losses += block_losses
+        return {'wins': wins, 'losses': losses, 'ties': rounds - wins - losses}
+
+    def source(strategy):
+        # stateless strategies are played round by round from blocks of moves
+        if strategy.stateless:
+            blocks = RandomBlocks(None, games, lambda rng, size: strategy.moves(size[0]))
+            return blocks.next
+        return strategy.move
+
+    move_a, move_b = source(strategy_a), source(strategy_b)
+    results = np.empty((BLOCK, games), dtype=np.int8)
+    for start in range(0, rounds, BLOCK):
+        n = min(BLOCK, rounds - start)
+        for i in range(n):
+            a, b = move_a(), move_b()
+            results[i] = PAYOFF[a, b]
+            strategy_a.update(a, b)
+            strategy_b.update(b, a)
+        block_wins, block_losses, _ = tally(results[:n])
+        wins += block_wins
+        losses += block_losses
+    return {'wins': wins, 'losses': losses, 'ties': rounds - wins - losses}
+
+
+if __name__ == '__main__':
+    import time
+
+    strategies = [RandomStrategy(), ConstantStrategy(ROCK), CycleStrategy(),
+                  BeatLastStrategy(), FrequencyStrategy(), MarkovStrategy(),
+                  NGramStrategy(3)]
+    for a in strategies:
+        for b in strategies:
+            start = time.perf_counter()
+            result = play(a, b, rounds=1000, games=1000, seed=0)
+            seconds = time.perf_counter() - start
+            print('{:>30} vs {:<30} {:6.3f} wins {:6.3f} losses, {:5.1f} M rounds/s'.format(
+                a.name, b.name, result['wins'].mean() / 1000,
+                result['losses'].mean() / 1000, 1e6 / seconds / 1e6))
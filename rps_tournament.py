@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Round robin tournament of rock, paper, scissors strategies
+
+Every pair of strategies plays a match of rps_engine.play(), the matches are
+distributed over a process pool. The result is a matrix of wins, losses and
+ties and an Elo rating of every strategy.
+
+The results of the matches are cached in a JSON file under the names and
+versions of both strategies, the number of rounds and games and the seed.
+Every match has its own seed derived from the tournament seed and the two
+names, so adding a strategy to a tournament only plays its new matches.
+
+The rounds are decided with rps_engine.PAYOFF instead of
+RockPaperScissors.evaluate_game / count_points of assignment_4.py, which
+work on one interactive game at a time and can not run in a worker process.
+check_payoff() makes sure both follow the same rules.
+"""
+
+import json
+import os
+import zlib
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+import rps_engine
+from assignment_4 import RockPaperScissors
+
+
+def check_payoff(choices=RockPaperScissors.choices):
+    """
+    Raises a ValueError if rps_engine.PAYOFF does not decide every pair of
+    moves like the rules choices[human][computer] of RockPaperScissors.
+    """
+    for human in rps_engine.MOVES:
+        for computer in rps_engine.MOVES:
+            if human == computer:
+                expected = 0
+            else:
+                expected = 1 if choices[human][computer] else -1
+            payoff = rps_engine.PAYOFF[rps_engine.encode(human), rps_engine.encode(computer)]
+            if payoff != expected:
+                raise ValueError('PAYOFF gives {} for {} against {}, the rules {}'.format(
+                    payoff, human, computer, expected))
+
+
+def match_key(strategy_a, strategy_b, rounds, games, seed):
+    return '{}@{}|{}@{}|{}|{}|{}'.format(strategy_a.name, strategy_a.version,
+                                         strategy_b.name, strategy_b.version,
+                                         rounds, games, seed)
+
+
+def match_seed(strategy_a, strategy_b, seed):
+    # crc32 instead of hash(), which changes between Python processes
+    return np.random.SeedSequence([seed,
+                                   zlib.crc32(strategy_a.name.encode()),
+                                   zlib.crc32(strategy_b.name.encode())])
+
+
+def _play_match(args):
+    strategy_a, strategy_b, rounds, games, seed = args
+    result = rps_engine.play(strategy_a, strategy_b, rounds, games, seed)
+    return [int(result['wins'].sum()), int(result['losses'].sum()),
+            int(result['ties'].sum())]
+
+
+def elo_ratings(wins, losses, ties, iterations=1000):
+    """
+    Elo ratings (mean 1500) fitted to all results at once with the
+    Bradley-Terry model, a tie counts as half a win. One tied game is added
+    to every pair, so that a strategy without any win gets a finite rating.
+    """
+    games = wins + losses + ties + 1
+    np.fill_diagonal(games, 0)
+    score = (wins + ties / 2 + 0.5) * (games > 0)
+    strength = np.ones(len(wins))
+    for _ in range(iterations):
+        # minorization-maximization update of Hunter (2004)
+        denominator = (games / (strength[:, np.newaxis] + strength[np.newaxis, :])).sum(axis=1)
+        updated = score.sum(axis=1) / denominator
+        updated /= np.exp(np.log(updated).mean())
+        if np.allclose(updated, strength, rtol=1e-10):
+            break
+        strength = updated
+    ratings = 400 * np.log10(strength)
+    return ratings - ratings.mean() + 1500
+
+
+def tournament(strategies, rounds=1000, games=100, seed=0, processes=None,
+               cache_file=None):
+    """
+    Plays every pair of strategies and returns a dict with the strategy
+    names, the matrices wins, losses and ties (row against column, summed
+    over all games) and the Elo ratings.
+    """
+    check_payoff()
+
+    names = [strategy.name for strategy in strategies]
+    if len(set(names)) < len(names):
+        raise ValueError('The names of the strategies are not unique')
+
+    cache = {}
+    if cache_file is not None and os.path.exists(cache_file):
+        with open(cache_file) as f:
+            cache = json.load(f)
+
+    pairs = [(i, j) for i in range(len(strategies)) for j in range(i + 1, len(strategies))]
+    keys = [match_key(strategies[i], strategies[j], rounds, games, seed) for i, j in pairs]
+    missing = [(pair, key) for pair, key in zip(pairs, keys) if key not in cache]
+    tasks = [(strategies[i], strategies[j], rounds, games,
+              match_seed(strategies[i], strategies[j], seed))
+             for (i, j), _ in missing]
+
+    if tasks:
+        processes = processes or cpu_count()
+        if processes > 1 and len(tasks) > 1:
+            with Pool(min(processes, len(tasks))) as pool:
+                results = pool.map(_play_match, tasks)
+        else:
+            results = [_play_match(task) for task in tasks]
+        for (_, key), result in zip(missing, results):
+            cache[key] = result
+        if cache_file is not None:
+            with open(cache_file, 'w') as f:
+                json.dump(cache, f, indent=1)
+
+    n = len(strategies)
+    wins = np.zeros((n, n), dtype=np.int64)
+    losses = np.zeros((n, n), dtype=np.int64)
+    ties = np.zeros((n, n), dtype=np.int64)
+    for (i, j), key in zip(pairs, keys):
+        wins[i, j], losses[i, j], ties[i, j] = cache[key]
+        wins[j, i], losses[j, i], ties[j, i] = losses[i, j], wins[i, j], ties[i, j]
+
+    return {'names': names, 'wins': wins, 'losses': losses, 'ties': ties,
+            'elo': elo_ratings(wins, losses, ties)}
+
+
+if __name__ == '__main__':
+    strategies = [rps_engine.RandomStrategy(), rps_engine.ConstantStrategy(),
+                  rps_engine.CycleStrategy(), rps_engine.BeatLastStrategy(),
+                  rps_engine.FrequencyStrategy(), rps_engine.MarkovStrategy()]
+    result = tournament(strategies, cache_file='./rps_tournament.json')
+    for name, rating in sorted(zip(result['names'], result['elo']), key=lambda x: -x[1]):
+        print('{:>30} {:7.1f}'.format(name, rating))